@@ -1,22 +1,54 @@
-from ._curried import async_derived, async_effect, batch, derived, derived_method, derived_property, effect, memoized, memoized_method, memoized_property, signal, state
-from .collections import reactive
+from ._curried import (
+    async_derived,
+    async_effect,
+    batch,
+    debounced_effect,
+    derived,
+    derived_family,
+    derived_method,
+    derived_property,
+    effect,
+    memoized,
+    memoized_family,
+    memoized_method,
+    memoized_property,
+    process_derived,
+    selector,
+    signal,
+    state,
+)
+from .collections import filter_sequence, map_sequence, reactive
 from .context import new_context
+from .equality import register_equality
+from .streams import derived_from_stream, signal_from_async_iter
+from .timing import throttled
 
 __all__ = [
     "async_derived",
     "async_effect",
     "batch",
+    "debounced_effect",
     "derived",
+    "derived_family",
+    "derived_from_stream",
     "derived_method",
     "derived_property",
     "effect",
+    "filter_sequence",
+    "map_sequence",
     "memoized",
+    "memoized_family",
     "memoized_method",
     "memoized_property",
     "new_context",
+    "process_derived",
     "reactive",
+    "register_equality",
+    "selector",
     "signal",
+    "signal_from_async_iter",
     "state",
+    "throttled",
 ]
 
 # for backwards compatibility
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Executor
 from functools import wraps
+from time import monotonic
 from typing import Any, overload
 
 from .context import Context
+from .equality import Equality
 
 
-def signal[T](initial_value: T = None, /, check_equality=True, *, context: Context | None = None) -> Signal[T]:
-    return Signal(initial_value, check_equality, context=context)
+def signal[T](initial_value: T = None, /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> Signal[T]:
+    return Signal(initial_value, check_equality, context=context, equals=equals)
 
 
-def state[T](initial_value: T = None, /, check_equality=True, *, context: Context | None = None) -> State[T]:
-    return State(initial_value, check_equality, context=context)
+def state[T](initial_value: T = None, /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> State[T]:
+    return State(initial_value, check_equality, context=context, equals=equals)
 
 
 __: Any = object()  # sentinel
@@ -31,39 +34,57 @@ def effect[T](fn: Callable[[], T] = __, /, call_immediately=True, *, context: Co
 
 
 @overload
-def derived[T](fn: Callable[[], T], /, check_equality=True, *, context: Context | None = None) -> Derived[T]: ...
+def derived[T](fn: Callable[[], T], /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> Derived[T]: ...
 @overload
-def derived[T](*, check_equality=True, context: Context | None = None) -> Callable[[Callable[[], T]], Derived[T]]: ...
+def derived[T](*, check_equality=True, context: Context | None = None, equals: Equality | None = None) -> Callable[[Callable[[], T]], Derived[T]]: ...
 
 
-def derived[T](fn: Callable[[], T] = __, /, check_equality=True, *, context: Context | None = None):  # type: ignore
+def derived[T](fn: Callable[[], T] = __, /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):  # type: ignore
     if fn is __:
-        return lambda fn: Derived(fn, check_equality, context=context)
-    return Derived(fn, check_equality, context=context)
+        return lambda fn: Derived(fn, check_equality, context=context, equals=equals)
+    return Derived(fn, check_equality, context=context, equals=equals)
 
 
 @overload
-def derived_property[T, I](method: Callable[[I], T], /, check_equality=True, *, context: Context | None = None) -> DerivedProperty[T, I]: ...
+def derived_property[T, I](method: Callable[[I], T], /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> DerivedProperty[T, I]: ...
 @overload
-def derived_property[T, I](*, check_equality=True, context: Context | None = None) -> Callable[[Callable[[I], T]], DerivedProperty[T, I]]: ...
+def derived_property[T, I](*, check_equality=True, context: Context | None = None, equals: Equality | None = None) -> Callable[[Callable[[I], T]], DerivedProperty[T, I]]: ...
 
 
-def derived_property[T, I](method: Callable[[I], T] = __, /, check_equality=True, *, context: Context | None = None):  # type: ignore
+def derived_property[T, I](method: Callable[[I], T] = __, /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):  # type: ignore
     if method is __:
-        return lambda method: DerivedProperty(method, check_equality, context=context)
-    return DerivedProperty(method, check_equality, context=context)
+        return lambda method: DerivedProperty(method, check_equality, context=context, equals=equals)
+    return DerivedProperty(method, check_equality, context=context, equals=equals)
 
 
 @overload
-def derived_method[T, I](method: Callable[[I], T], /, check_equality=True, *, context: Context | None = None) -> DerivedMethod[T, I]: ...
+def derived_method[T, I](method: Callable[[I], T], /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> DerivedMethod[T, I]: ...
 @overload
-def derived_method[T, I](*, check_equality=True, context: Context | None = None) -> Callable[[Callable[[I], T]], DerivedMethod[T, I]]: ...
+def derived_method[T, I](*, check_equality=True, context: Context | None = None, equals: Equality | None = None) -> Callable[[Callable[[I], T]], DerivedMethod[T, I]]: ...
 
 
-def derived_method[T, I](method: Callable[[I], T] = __, /, check_equality=True, *, context: Context | None = None):  # type: ignore
+def derived_method[T, I](method: Callable[[I], T] = __, /, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):  # type: ignore
     if method is __:
-        return lambda method: DerivedMethod(method, check_equality, context=context)
-    return DerivedMethod(method, check_equality, context=context)
+        return lambda method: DerivedMethod(method, check_equality, context=context, equals=equals)
+    return DerivedMethod(method, check_equality, context=context, equals=equals)
+
+
+@overload
+def derived_family[T](
+    fn: Callable[..., T], /, check_equality=True, *, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None, equals: Equality | None = None
+) -> DerivedFamily[T]: ...
+@overload
+def derived_family[T](
+    *, check_equality=True, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None, equals: Equality | None = None
+) -> Callable[[Callable[..., T]], DerivedFamily[T]]: ...
+
+
+def derived_family[T](
+    fn: Callable[..., T] = __, /, check_equality=True, *, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None, equals: Equality | None = None
+) -> DerivedFamily[T] | Callable[[Callable[..., T]], DerivedFamily[T]]:
+    if fn is __:
+        return lambda fn: DerivedFamily(fn, check_equality, max_size=max_size, ttl=ttl, evict_unobserved=evict_unobserved, context=context, equals=equals)
+    return DerivedFamily(fn, check_equality, max_size=max_size, ttl=ttl, evict_unobserved=evict_unobserved, context=context, equals=equals)
 
 
 @overload
@@ -103,47 +124,148 @@ def memoized_method[T, I](method: Callable[[I], T] = __, /, *, context: Context
 
 
 @overload
-def async_effect[T](fn: Callable[[], Awaitable[T]], /, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory | None = None) -> AsyncEffect[T]: ...
+def memoized_family[T](fn: Callable[..., T], /, *, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None) -> MemoizedFamily[T]: ...
 @overload
-def async_effect[T](*, call_immediately=True, context: Context | None = None, task_factory: TaskFactory | None = None) -> Callable[[Callable[[], Awaitable[T]]], AsyncEffect[T]]: ...
+def memoized_family[T](*, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None) -> Callable[[Callable[..., T]], MemoizedFamily[T]]: ...
 
 
-def async_effect[T](fn: Callable[[], Awaitable[T]] = __, /, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory | None = None):  # type: ignore
+def memoized_family[T](fn: Callable[..., T] = __, /, *, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None):  # type: ignore
     if fn is __:
-        return lambda fn: AsyncEffect(fn, call_immediately, context=context, task_factory=task_factory or default_task_factory)
-    return AsyncEffect(fn, call_immediately, context=context, task_factory=task_factory or default_task_factory)
+        return lambda fn: MemoizedFamily(fn, max_size=max_size, ttl=ttl, evict_unobserved=evict_unobserved, context=context)
+    return MemoizedFamily(fn, max_size=max_size, ttl=ttl, evict_unobserved=evict_unobserved, context=context)
 
 
 @overload
-def async_derived[T](fn: Callable[[], Awaitable[T]], /, check_equality=True, *, context: Context | None = None, task_factory: TaskFactory | None = None) -> AsyncDerived[T]: ...
+def async_effect[T](
+    fn: Callable[[], Awaitable[T]], /, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory | None = None, policy: RunPolicy = "concurrent"
+) -> AsyncEffect[T]: ...
 @overload
-def async_derived[T](*, check_equality=True, context: Context | None = None, task_factory: TaskFactory | None = None) -> Callable[[Callable[[], Awaitable[T]]], AsyncDerived[T]]: ...
+def async_effect[T](
+    *, call_immediately=True, context: Context | None = None, task_factory: TaskFactory | None = None, policy: RunPolicy = "concurrent"
+) -> Callable[[Callable[[], Awaitable[T]]], AsyncEffect[T]]: ...
 
 
-def async_derived[T](fn: Callable[[], Awaitable[T]] = __, /, check_equality=True, *, context: Context | None = None, task_factory: TaskFactory | None = None):  # type: ignore
+def async_effect[T](fn: Callable[[], Awaitable[T]] = __, /, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory | None = None, policy: RunPolicy = "concurrent"):  # type: ignore
     if fn is __:
-        return lambda fn: AsyncDerived(fn, check_equality, context=context, task_factory=task_factory or default_task_factory)
-    return AsyncDerived(fn, check_equality, context=context, task_factory=task_factory or default_task_factory)
+        return lambda fn: AsyncEffect(fn, call_immediately, context=context, task_factory=task_factory or default_task_factory, policy=policy)
+    return AsyncEffect(fn, call_immediately, context=context, task_factory=task_factory or default_task_factory, policy=policy)
+
+
+@overload
+def async_derived[T](
+    fn: Callable[[], Awaitable[T]],
+    /,
+    check_equality=True,
+    *,
+    context: Context | None = None,
+    equals: Equality | None = None,
+    task_factory: TaskFactory | None = None,
+    policy: RunPolicy = "concurrent",
+    stale_while_revalidate=False,
+    max_staleness: float | None = None,
+) -> AsyncDerived[T]: ...
+@overload
+def async_derived[T](
+    *,
+    check_equality=True,
+    context: Context | None = None,
+    equals: Equality | None = None,
+    task_factory: TaskFactory | None = None,
+    policy: RunPolicy = "concurrent",
+    stale_while_revalidate=False,
+    max_staleness: float | None = None,
+) -> Callable[[Callable[[], Awaitable[T]]], AsyncDerived[T]]: ...
+
+
+def async_derived[T](
+    fn: Callable[[], Awaitable[T]] = __,
+    /,
+    check_equality=True,
+    *,
+    context: Context | None = None,
+    equals: Equality | None = None,
+    task_factory: TaskFactory | None = None,
+    policy: RunPolicy = "concurrent",
+    stale_while_revalidate=False,
+    max_staleness: float | None = None,
+) -> AsyncDerived[T] | Callable[[Callable[[], Awaitable[T]]], AsyncDerived[T]]:
+    if fn is __:
+        return lambda fn: async_derived(
+            fn, check_equality, context=context, equals=equals, task_factory=task_factory, policy=policy, stale_while_revalidate=stale_while_revalidate, max_staleness=max_staleness
+        )
+    return AsyncDerived(
+        fn,
+        check_equality,
+        context=context,
+        equals=equals,
+        task_factory=task_factory or default_task_factory,
+        policy=policy,
+        stale_while_revalidate=stale_while_revalidate,
+        max_staleness=max_staleness,
+    )
+
+
+@overload
+def debounced_effect[T](
+    fn: Callable[[], T], /, wait: float, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory | None = None, timer: Callable[[], float] = monotonic
+) -> DebouncedEffect[T]: ...
+@overload
+def debounced_effect[T](
+    *, wait: float, call_immediately=True, context: Context | None = None, task_factory: TaskFactory | None = None, timer: Callable[[], float] = monotonic
+) -> Callable[[Callable[[], T]], DebouncedEffect[T]]: ...
+
+
+def debounced_effect[T](
+    fn: Callable[[], T] = __,
+    /,
+    wait: float = 0,
+    call_immediately=True,
+    *,
+    context: Context | None = None,
+    task_factory: TaskFactory | None = None,
+    timer: Callable[[], float] = monotonic,
+) -> DebouncedEffect[T] | Callable[[Callable[[], T]], DebouncedEffect[T]]:
+    if fn is __:
+        return lambda fn: DebouncedEffect(fn, wait, call_immediately, context=context, task_factory=task_factory or default_task_factory, timer=timer)
+    return DebouncedEffect(fn, wait, call_immediately, context=context, task_factory=task_factory or default_task_factory, timer=timer)
+
+
+def process_derived[T](
+    fn: Callable[..., T],
+    /,
+    *inputs: Callable[[], Any],
+    executor: Executor | None = None,
+    check_equality=True,
+    context: Context | None = None,
+    equals: Equality | None = None,
+    task_factory: TaskFactory | None = None,
+) -> ProcessDerived[T]:
+    return ProcessDerived(fn, *inputs, executor=executor, check_equality=check_equality, context=context, equals=equals, task_factory=task_factory or default_task_factory)
+
+
+def selector[K: Hashable](source: Callable[[], K] | Signal[K], /, *, context: Context | None = None) -> Selector[K]:
+    return Selector(source.get if isinstance(source, Signal) else source, context=context)
 
 
 @overload
-def batch(*, context: Context | None = None) -> Batch: ...
+def batch(*, context: Context | None = None, executor: Executor | None = None) -> Batch: ...
 @overload
-def batch[**P, T](func: Callable[P, T], /, context: Context | None = None) -> Callable[P, T]: ...
+def batch[**P, T](func: Callable[P, T], /, context: Context | None = None, executor: Executor | None = None) -> Callable[P, T]: ...
 
 
-def batch[**P, T](func: Callable[P, T] = __, /, context: Context | None = None) -> Callable[P, T] | Batch:
+def batch[**P, T](func: Callable[P, T] = __, /, context: Context | None = None, executor: Executor | None = None) -> Callable[P, T] | Batch:
     if func is __:
-        return Batch(context=context)
+        return Batch(context=context, executor=executor)
 
     @wraps(func)
     def wrapped(*args, **kwargs):
-        with Batch(context=context):
+        with Batch(context=context, executor=executor):
             return func(*args, **kwargs)
 
     return wrapped
 
 
-from .async_primitives import AsyncDerived, AsyncEffect, TaskFactory, default_task_factory
-from .helpers import DerivedMethod, DerivedProperty, Memoized, MemoizedMethod, MemoizedProperty
+from .async_primitives import AsyncDerived, AsyncEffect, ProcessDerived, RunPolicy, TaskFactory, default_task_factory
+from .helpers import DerivedFamily, DerivedMethod, DerivedProperty, Memoized, MemoizedFamily, MemoizedMethod, MemoizedProperty, Selector
 from .primitives import Batch, Derived, Effect, Signal, State
+from .timing import DebouncedEffect
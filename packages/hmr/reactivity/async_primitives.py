@@ -1,66 +1,421 @@
 from collections.abc import Awaitable, Callable, Coroutine
+from concurrent.futures import Executor, Future
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import cache
+from inspect import isawaitable
 from sys import platform
-from typing import Any, Protocol
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Literal, Protocol
 
 from .context import Context
-from .primitives import BaseComputation, BaseDerived, Effect, _equal, _pulled
+from .equality import Equality, equal
+from .primitives import BaseComputation, BaseDerived, Effect, Signal
+
+if TYPE_CHECKING:
+    from asyncio import TaskGroup
+
+    from trio import Nursery
 
 type AsyncFunction[T] = Callable[[], Coroutine[Any, Any, T]]
 
+type RunPolicy = Literal["concurrent", "latest", "coalesce"]
+"""
+What happens when a computation is triggered while a previous run is still in flight:
+
+- `"concurrent"`: start another run, both run to completion.
+- `"latest"`: cancel the previous run, its awaiters get the result of the newer one.
+- `"coalesce"`: let the previous run finish, then rerun once however many triggers came in meanwhile.
+"""
+
 
 class TaskFactory(Protocol):
     def __call__[T](self, func: AsyncFunction[T], /) -> Awaitable[T]: ...
 
 
-def default_task_factory[T](async_function: AsyncFunction[T]) -> Awaitable[T]:
+class _Result[T]:
+    """An awaitable for the result of a trio task, which can be awaited multiple times."""
+
+    __slots__ = ("_event", "_exception", "_value")
+
+    def __init__(self):
+        from trio import Event
+
+        self._event = Event()
+        self._exception: BaseException | None = None
+
+    async def _run(self, async_function: AsyncFunction[T]):
+        try:
+            self._value = await async_function()
+        except BaseException as e:
+            self._exception = e
+        finally:
+            self._event.set()
+
+    def __await__(self):
+        if not self._event.is_set():
+            yield from self._event.wait().__await__()
+        if self._exception is not None:
+            raise self._exception
+        return self._value
+
+
+class TaskGroupFactory:
+    """A `TaskFactory` that starts tasks in a long-lived `asyncio.TaskGroup` or trio nursery."""
+
+    __slots__ = ("_spawn",)
+
+    def __init__(self, group: "TaskGroup | Nursery"):
+        if (create_task := getattr(group, "create_task", None)) is not None:
+            self._spawn = lambda async_function: create_task(async_function())
+        else:
+            start_soon = group.start_soon  # type: ignore
+
+            def spawn(async_function):
+                result = _Result()
+                start_soon(result._run, async_function)  # noqa: SLF001
+                return result
+
+            self._spawn = spawn
+
+    def __call__[T](self, async_function: AsyncFunction[T]) -> Awaitable[T]:
+        return self._spawn(async_function)
+
+
+_bound_task_factory = ContextVar[TaskFactory | None]("bound_task_factory", default=None)
+
+
+@asynccontextmanager
+async def task_group():
+    """
+    Open a task group (a nursery on trio) and make `default_task_factory` start its tasks there, for everything running inside the block and the tasks it starts.
+
+    The async library is only looked up once when entering, and the block waits for the started tasks before exiting.
+    """
+    from asyncio import TaskGroup
+
+    manager = TaskGroup()
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
+            from trio import open_nursery
+
+            manager = open_nursery()
+
+    async with manager as group:
+        factory = TaskGroupFactory(group)
+        token = _bound_task_factory.set(factory)
+        try:
+            yield factory
+        finally:
+            _bound_task_factory.reset(token)
+
+
+def _ensure_future[T](async_function: AsyncFunction[T]) -> Awaitable[T]:
+    from asyncio import ensure_future
+
+    return ensure_future(async_function())
+
+
+def _spawn_system_task[T](async_function: AsyncFunction[T]) -> Awaitable[T]:
+    from trio.lowlevel import spawn_system_task
+
+    result = _Result[T]()
+    spawn_system_task(result._run, async_function)  # noqa: SLF001
+    return result
+
+
+@cache
+def _library_probes():
+    """Imported once, since `default_task_factory` checks them on every call."""
+    from asyncio import _get_running_loop
+
     if platform == "emscripten":
-        from asyncio import ensure_future
+        return None, _get_running_loop
+
+    from sniffio import thread_local
+
+    return thread_local, _get_running_loop
+
+
+def default_task_factory[T](async_function: AsyncFunction[T]) -> Awaitable[T]:
+    if (factory := _bound_task_factory.get()) is not None:
+        return factory(async_function)
 
-        return ensure_future(async_function())
+    sniffed, get_running_loop = _library_probes()
+    if sniffed is None:
+        return _ensure_future(async_function)
+    if sniffed.name == "trio":
+        return _spawn_system_task(async_function)
+    if get_running_loop() is not None:
+        return _ensure_future(async_function)
 
     from sniffio import AsyncLibraryNotFoundError, current_async_library
 
     match current_async_library():
         case "asyncio":
-            from asyncio import ensure_future
+            return _ensure_future(async_function)
+        case "trio":
+            return _spawn_system_task(async_function)
+        case _ as other:
+            raise AsyncLibraryNotFoundError(f"Only asyncio and trio are supported, not {other}")  # noqa: TRY003
 
-            return ensure_future(async_function())
 
-        case "trio":
+async def wait_future[T](future: Future[T]) -> T:
+    """Wait for a `concurrent.futures.Future` without blocking the event loop."""
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
             from trio import Event
-            from trio.lowlevel import spawn_system_task
+            from trio.lowlevel import current_trio_token
 
             evt = Event()
-            res: T
-            exc: BaseException | None = None
-
-            @spawn_system_task
-            async def _():
-                nonlocal res, exc
-                try:
-                    res = await async_function()
-                except BaseException as e:
-                    exc = e
-                finally:
-                    evt.set()
-
-            class Future:  # An awaitable that can be awaited multiple times
-                def __await__(self):
-                    if not evt.is_set():
-                        yield from evt.wait().__await__()
-                    if exc is not None:
-                        raise exc
-                    return res  # noqa: F821
-
-            return Future()
+            token = current_trio_token()
+            future.add_done_callback(lambda _: token.run_sync_soon(evt.set))
+            await evt.wait()
+            return future.result()
 
-        case _ as other:
-            raise AsyncLibraryNotFoundError(f"Only asyncio and trio are supported, not {other}")  # noqa: TRY003
+    from asyncio import wrap_future
+
+    return await wrap_future(future)
+
+
+async def sleep(seconds: float):
+    """Sleep with the running async library."""
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
+            from trio import sleep
+
+            return await sleep(seconds)
+
+    from asyncio import sleep
+
+    await sleep(seconds)
+
+
+def _event():
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
+            from trio import Event
+
+            return Event()
+
+    from asyncio import Event
+
+    return Event()
+
+
+def _current_task() -> object:
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
+            from trio.lowlevel import current_task
+
+            return current_task()
+
+    from asyncio import current_task
+
+    return current_task()
+
+
+class ConcurrencyLimiter:
+    """
+    A `TaskFactory` that lets at most `limit` tasks run at once. The others wait in a queue, higher `priority` first, then in order of arrival.
+
+    Share one limiter between nodes to bound their recomputations together, and use `with_priority` to let some of them skip ahead.
+    A task gives its slot back while it awaits another task of the same limiter (like an `AsyncDerived` awaiting its dependencies), so nested awaits can't deadlock.
+    """
+
+    __slots__ = ("_counter", "_holders", "_waiters", "limit", "running", "start")
+
+    def __init__(self, limit: int, *, task_factory: TaskFactory = default_task_factory):
+        from itertools import count
 
+        self.limit = limit
+        self.start = task_factory
+        self.running = 0
+        self._waiters: list[tuple[int, int, Any]] = []
+        self._counter = count()
+        self._holders: dict[object, int] = {}
+        """Tasks holding a slot, and their priorities."""
+
+    async def _acquire(self, priority: int):
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+            return
+        from heapq import heappush
+
+        event = _event()
+        entry = (-priority, next(self._counter), event)
+        heappush(self._waiters, entry)
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                self._release()  # the slot was handed over already
+            else:
+                from heapq import heapify
+
+                self._waiters.remove(entry)
+                heapify(self._waiters)
+            raise
+
+    def _release(self):
+        if self._waiters:
+            from heapq import heappop
+
+            heappop(self._waiters)[2].set()  # hand the slot over
+        else:
+            self.running -= 1
+
+    async def _run[T](self, async_function: AsyncFunction[T], priority: int) -> T:
+        await self._acquire(priority)
+        task = _current_task()
+        self._holders[task] = priority
+        try:
+            return await async_function()
+        finally:
+            if self._holders.pop(task, None) is not None:
+                self._release()
+
+    async def _wait[T](self, awaitable: Awaitable[T]) -> T:
+        if (priority := self._holders.pop(task := _current_task(), None)) is None:
+            return await awaitable
+        self._release()
+        try:
+            return await awaitable
+        finally:
+            await self._acquire(priority)
+            self._holders[task] = priority
+
+    def _start[T](self, async_function: AsyncFunction[T], priority: int) -> Awaitable[T]:
+        return _Limited(self, self.start(lambda: self._run(async_function, priority)))
+
+    def with_priority(self, priority: int) -> TaskFactory:
+        return lambda async_function: self._start(async_function, priority)
+
+    def __call__[T](self, async_function: AsyncFunction[T]) -> Awaitable[T]:
+        return self._start(async_function, 0)
+
+
+class _Limited[T]:
+    __slots__ = ("limiter", "task")
+
+    def __init__(self, limiter: ConcurrencyLimiter, task: Awaitable[T]):
+        self.limiter = limiter
+        self.task = task
+
+    def __await__(self):
+        return self.limiter._wait(self.task).__await__()  # noqa: SLF001
+
+
+class _Superseded(Exception):  # noqa: N818
+    pass
+
+
+class _Run[T]:
+    __slots__ = ("_cancel", "cancelled", "next", "rerun", "task")
+
+    task: Awaitable[T]
+    """Set by `AsyncEffect.trigger` right after creating the run."""
+
+    def __init__(self):
+        self.next: _Run[T] | None = None
+        """The run that superseded this one."""
+        self.rerun = False
+        self.cancelled = False
+        self._cancel: Callable[[], Any] | None = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self._cancel is not None:
+            self._cancel()
+
+
+async def _cancellable[T](run: _Run, async_function: AsyncFunction[T]) -> T:
+    """Run `async_function` in the current task so that `run.cancel()` interrupts it. A cancelled run raises `_Superseded`."""
+    if platform != "emscripten":
+        from sniffio import current_async_library
+
+        if current_async_library() == "trio":
+            from trio import CancelScope
+
+            with CancelScope() as scope:
+                run._cancel = scope.cancel  # noqa: SLF001
+                if run.cancelled:
+                    scope.cancel()
+                return await async_function()
+            raise _Superseded
+
+    from asyncio import CancelledError, current_task
+
+    if run.cancelled:
+        raise _Superseded
+    task = current_task()
+    assert task is not None
+    run._cancel = task.cancel  # noqa: SLF001
+    try:
+        return await async_function()
+    except CancelledError:
+        if not run.cancelled:
+            raise
+        task.uncancel()
+        raise _Superseded from None
+    finally:
+        run._cancel = None  # noqa: SLF001
+
+
+class _PolicyMixin[T]:
+    __slots__ = ()
+
+    policy: RunPolicy
+    _current: _Run[T] | None
+
+    _run_in_context: AsyncFunction[T]
 
-class AsyncEffect[T](Effect[Awaitable[T]]):
-    def __init__(self, fn: Callable[[], Awaitable[T]], call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory = default_task_factory):
+    async def _run(self, run: _Run[T]) -> T:
+        match self.policy:
+            case "latest":
+                return await _cancellable(run, self._run_in_context)
+            case "coalesce":
+                while True:
+                    run.rerun = False
+                    try:
+                        value = await self._run_in_context()
+                    except Exception:
+                        if not run.rerun:
+                            raise
+                        continue
+                    if not run.rerun:
+                        return value
+            case _:
+                return await self._run_in_context()
+
+
+class AsyncEffect[T](_PolicyMixin[T], Effect[Awaitable[T]]):
+    __slots__ = ("_current", "policy", "start")
+
+    parallel = False  # tasks have to be started from the thread running the event loop
+
+    def __init__(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        call_immediately=True,
+        *,
+        context: Context | None = None,
+        task_factory: TaskFactory = default_task_factory,
+        policy: RunPolicy = "concurrent",
+    ):
         self.start = task_factory
+        self.policy = policy
+        self._current = None
         Effect.__init__(self, fn, call_immediately, context=context)
 
     async def _run_in_context(self):
@@ -68,21 +423,120 @@ class AsyncEffect[T](Effect[Awaitable[T]]):
         with self._enter():
             return await self._fn()
 
-    def trigger(self):
-        return self.start(self._run_in_context)
+    async def _run_effect(self, run: _Run[T]) -> T:
+        try:
+            return await self._run(run)
+        except _Superseded:
+            assert run.next is not None
+            return await run.next.task
+        finally:
+            if self._current is run:
+                self._current = None
+
+    def trigger(self) -> Awaitable[T]:
+        if self.policy == "concurrent":
+            return self.start(self._run_in_context)
+        if (previous := self._current) is not None:
+            if self.policy == "coalesce":
+                previous.rerun = True
+                return previous.task
+            previous.cancel()
+        run = self._current = _Run()
+        if previous is not None:
+            previous.next = run
+        run.task = self.start(lambda: self._run_effect(run))
+        return run.task
+
+
+class AsyncDerived[T](_PolicyMixin[T], BaseDerived[Awaitable[T]]):
+    """
+    An async derived value. Awaiting a call waits for the recomputation if some dependency changed.
 
+    With `stale_while_revalidate=True`, a call on a dirty node returns the last value right away and refreshes it in the background.
+    Subscribers are notified when the new value lands. Errors of background refreshes are not raised but kept in `error`.
+    Once the value has been stale for more than `max_staleness` seconds (measured by `timer`), calls wait for the refresh again.
+    """
+
+    __slots__ = (
+        "__dict__",
+        "_call_task",
+        "_current",
+        "_dependencies",
+        "_equals",
+        "_error",
+        "_error_signal",
+        "_refreshing_signal",
+        "_revalidation",
+        "_stale",
+        "_stale_since",
+        "_sync_dirty_deps_task",
+        "_value",
+        "dirty",
+        "fn",
+        "height",
+        "max_staleness",
+        "observers",
+        "policy",
+        "stale_while_revalidate",
+        "start",
+        "timer",
+    )
 
-class AsyncDerived[T](BaseDerived[Awaitable[T]]):
     UNSET: T = object()  # type: ignore
 
-    def __init__(self, fn: Callable[[], Awaitable[T]], check_equality=True, *, context: Context | None = None, task_factory: TaskFactory = default_task_factory):
+    def __init__(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        check_equality=True,
+        *,
+        context: Context | None = None,
+        task_factory: TaskFactory = default_task_factory,
+        equals: Equality | None = None,
+        policy: RunPolicy = "concurrent",
+        stale_while_revalidate=False,
+        max_staleness: float | None = None,
+        timer: Callable[[], float] = monotonic,
+    ):
         super().__init__(context=context)
         self.fn = fn
-        self._check_equality = check_equality
+        self._equals = (equals or equal) if check_equality else None
         self._value = self.UNSET
         self.start: TaskFactory = task_factory
+        self.policy = policy
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_staleness = max_staleness
+        self.timer = timer
+        self._current = None
         self._call_task: Awaitable[None] | None = None
         self._sync_dirty_deps_task: Awaitable[None] | None = None
+        self._revalidation: Awaitable[None] | None = None
+        self._stale_since: float | None = None
+        self._error: Exception | None = None
+        self._error_signal: Signal[Exception | None] | None = None
+        self._refreshing_signal: Signal[bool] | None = None
+
+    @property
+    def is_refreshing(self) -> Signal[bool]:
+        """A signal telling whether a recomputation is in flight. Created on first access."""
+        if self._refreshing_signal is None:
+            self._refreshing_signal = Signal(self._current is not None, context=self.context)
+        return self._refreshing_signal
+
+    @property
+    def error(self) -> Signal[Exception | None]:
+        """A signal holding the exception of the last recomputation, or `None` if it succeeded. Created on first access."""
+        if self._error_signal is None:
+            self._error_signal = Signal(self._error, context=self.context)
+        return self._error_signal
+
+    def _set_refreshing(self, refreshing: bool):
+        if (signal := self._refreshing_signal) is not None:
+            signal.set(refreshing)
+
+    def _set_error(self, error: Exception | None):
+        self._error = error
+        if (signal := self._error_signal) is not None:
+            signal.set(error)
 
     async def _run_in_context(self):
         self.context.fork()
@@ -91,11 +545,31 @@ class AsyncDerived[T](BaseDerived[Awaitable[T]]):
 
     async def recompute(self):
         try:
-            value = await self._run_in_context()
+            await self._recompute()
+        except _Superseded:
+            if self._call_task is None:
+                self._call_task = self.start(self.recompute)
+            await self._call_task  # callers waiting for this run get the newer value instead
+
+    async def _recompute(self):
+        run = self._current = _Run()
+        self._set_refreshing(True)
+        try:
+            value = await self._run(run)
+        except _Superseded:
+            raise
+        except Exception as e:
+            self._set_error(e)
+            raise
         finally:
+            if self._current is run:
+                self._current = None
+                self._set_refreshing(False)
             if self._call_task is not None:
                 self.dirty = False  # If invalidated before this run completes, stay dirty.
-        if self._check_equality and _equal(value, self._value):
+        if self._error is not None:
+            self._set_error(None)
+        if (equals := self._equals) is not None and equals(value, self._value):
             return
         if self._value is self.UNSET:
             self._value = value
@@ -106,9 +580,9 @@ class AsyncDerived[T](BaseDerived[Awaitable[T]]):
 
     async def __sync_dirty_deps(self, *_syncing: BaseComputation):
         try:
-            current_computations = self.context.leaf.current_computations
+            skipped = {*self.context.leaf.current_computations, *_syncing}
             for dep in tuple(self.dependencies):  # note: I don't know why but `self.dependencies` may shrink during iteration
-                if isinstance(dep, BaseDerived) and dep not in current_computations and dep not in _syncing:
+                if isinstance(dep, BaseDerived) and dep not in skipped:
                     if isinstance(dep, AsyncDerived):
                         await dep._sync_dirty_deps(*_syncing, self)  # noqa: SLF001
                         if dep.dirty:
@@ -123,10 +597,43 @@ class AsyncDerived[T](BaseDerived[Awaitable[T]]):
     def _sync_dirty_deps(self, *_syncing: BaseComputation):
         if self._sync_dirty_deps_task is not None:
             return self._sync_dirty_deps_task
+        self._stale = False
         task = self._sync_dirty_deps_task = self.start(lambda: self.__sync_dirty_deps(*_syncing))
         return task
 
     async def _call_async(self):
+        if self.stale_while_revalidate and self._value is not self.UNSET and self._serve_stale():
+            if self._revalidation is None and (self.dirty or self._stale):
+                self._revalidation = self.start(self._revalidate)
+            return self._value
+        value = await self._fetch()
+        self._stale_since = None
+        return value
+
+    def _mark_dirty(self):
+        if self._stale_since is None:
+            self._stale_since = self.timer()
+        super()._mark_dirty()
+
+    def _serve_stale(self):
+        if not (self.dirty or self._stale):
+            return True
+        now = self.timer()
+        if self._stale_since is None:  # only marked stale by an upstream node, which may still turn out unchanged
+            self._stale_since = now
+        return self.max_staleness is None or now - self._stale_since <= self.max_staleness
+
+    async def _revalidate(self):
+        try:
+            while self.dirty or self._stale:  # invalidated again while refreshing
+                await self._fetch()
+            self._stale_since = None
+        except Exception as e:
+            self._set_error(e)  # nobody awaits this task, so the error is only reported through `error`
+        finally:
+            self._revalidation = None
+
+    async def _fetch(self):
         await self._sync_dirty_deps()
         try:
             if self.dirty:
@@ -144,10 +651,79 @@ class AsyncDerived[T](BaseDerived[Awaitable[T]]):
         return self.start(self._call_async)
 
     def trigger(self):
-        self.dirty = True
+        self._mark_dirty()
+        if (run := self._current) is not None:
+            if self.policy == "coalesce":
+                run.rerun = True
+                return self._call_task
+            if self.policy == "latest":
+                run.cancel()
         self._call_task = None
-        if _pulled(self):
+        if self.observers:
             return self()
 
     def invalidate(self):
         self.trigger()
+
+
+_default_executor: Executor | None = None
+
+
+def _get_default_executor():
+    global _default_executor
+    if _default_executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _default_executor = ProcessPoolExecutor()
+    return _default_executor
+
+
+class ProcessDerived[T](AsyncDerived[T]):
+    """
+    An `AsyncDerived` for CPU-heavy pure functions. `inputs` are read (and tracked) in this process, then `function(*values)` runs in `executor`.
+
+    Inputs can be any zero-argument callables, like `Signal.get` or other deriveds (async ones are awaited).
+    `function` and the values have to be picklable for process pools. The default executor is a shared `ProcessPoolExecutor`.
+    When inputs change while a job is in flight, the job is cancelled if it hasn't started yet, and its result is discarded otherwise.
+    """
+
+    __slots__ = ("_future", "_generation", "executor", "function", "inputs")
+
+    def __init__(
+        self,
+        function: Callable[..., T],
+        *inputs: Callable[[], Any],
+        executor: Executor | None = None,
+        check_equality=True,
+        context: Context | None = None,
+        task_factory: TaskFactory = default_task_factory,
+        equals: Equality | None = None,
+    ):
+        super().__init__(self._compute, check_equality, context=context, task_factory=task_factory, equals=equals)
+        self.function = function
+        self.inputs = inputs
+        self.executor = executor
+        self._future: Future[T] | None = None
+        self._generation = 0
+
+    async def _compute(self) -> T:
+        generation = self._generation
+        values = [await value if isawaitable(value := read()) else value for read in self.inputs]
+        if generation != self._generation:
+            raise _Superseded
+        if (previous := self._future) is not None:
+            previous.cancel()
+        future = self._future = (self.executor or _get_default_executor()).submit(self.function, *values)
+        try:
+            value = await wait_future(future)
+        except BaseException:
+            if generation == self._generation:
+                raise
+            raise _Superseded from None
+        if generation != self._generation:
+            raise _Superseded
+        return value
+
+    async def recompute(self):
+        self._generation += 1
+        await super().recompute()
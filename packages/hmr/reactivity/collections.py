@@ -4,16 +4,18 @@ from functools import update_wrapper
 from typing import Any, overload
 
 from .context import Context, default_context
-from .primitives import Derived, Effect, Signal, Subscribable, _equal
+from .equality import Equality, equal
+from .primitives import Derived, Effect, Signal, Subscribable
 
 
 class ReactiveMappingProxy[K, V](MutableMapping[K, V]):
     def _signal(self, value=False):
         return Signal(value, context=self.context)  # False for unset
 
-    def __init__(self, initial: MutableMapping[K, V], check_equality=True, *, context: Context | None = None):
+    def __init__(self, initial: MutableMapping[K, V], check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         self.context = context or default_context
         self._check_equality = check_equality
+        self._equals = equals or equal
         self._data = initial
         self._keys = defaultdict(self._signal, {k: self._signal(True) for k in tuple(initial)})  # in subclasses, self._signal() may mutate `initial`
         self._iter = Subscribable()
@@ -25,7 +27,7 @@ class ReactiveMappingProxy[K, V](MutableMapping[K, V]):
 
     def __setitem__(self, key: K, value: V):
         if self._keys[key]._value:  # noqa: SLF001
-            should_notify = not self._check_equality or not _equal(self._data[key], value)
+            should_notify = not self._check_equality or not self._equals(self._data[key], value)
             self._data[key] = value
             if should_notify:
                 self._keys[key].notify()
@@ -58,8 +60,8 @@ class ReactiveMappingProxy[K, V](MutableMapping[K, V]):
 
 
 class ReactiveMapping[K, V](ReactiveMappingProxy[K, V]):
-    def __init__(self, initial: Mapping[K, V] | None = None, check_equality=True, *, context: Context | None = None):
-        super().__init__({**initial} if initial is not None else {}, check_equality, context=context)
+    def __init__(self, initial: Mapping[K, V] | None = None, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
+        super().__init__({**initial} if initial is not None else {}, check_equality, context=context, equals=equals)
 
 
 class ReactiveSetProxy[T](MutableSet[T]):
@@ -121,8 +123,7 @@ def _weak_derived[T](fn: Callable[[], T], check_equality=True, *, context: Conte
     d = Derived(fn, check_equality, context=context)
     s = d.subscribers = ReactiveSetProxy(d.subscribers)  # type: ignore
     e = Effect(lambda: not s and d.dispose(), False)  # when `subscribers` is empty, gc it
-    s._iter.subscribers.add(e)  # noqa: SLF001
-    e.dependencies.add(s._iter)  # noqa: SLF001
+    s._iter.subscribe(e)  # noqa: SLF001
     return d
 
 
@@ -130,13 +131,16 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
     def _signal(self):
         return Subscribable(context=self.context)
 
-    def __init__(self, initial: MutableSequence[T], check_equality=True, *, context: Context | None = None):
+    def __init__(self, initial: MutableSequence[T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         self.context = context or default_context
         self._check_equality = check_equality
+        self._equals = equals or equal
         self._data = initial
         self._keys = keys = defaultdict(self._signal)  # positive and negative index signals
         self._iter = Subscribable()
         self._length = len(initial)
+        self._listeners: list[Callable[[int, int, list[T]], Any]] = []
+        """Called with `(start, stop, items)` before `self[start:stop]` is replaced, inside the same batch."""
 
         for index in range(-len(initial), len(initial)):
             keys[index] = self._signal()
@@ -174,8 +178,12 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
         target = [*target]
         assert start <= stop
         delta = len(target) - (stop - start)
+        equals = self._equals
 
         with self.context.batch(force_flush=False):
+            for listener in self._listeners:
+                listener(start, stop, target)
+
             if delta > 0:
                 if not self._check_equality:
                     for i in range(start, self._length + delta):
@@ -186,19 +194,19 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
                     for i in range(start, self._length + delta):
                         if i < self._length:
                             if i - start < len(target):
-                                if _equal(self._data[i], target[i - start]):
+                                if equals(self._data[i], target[i - start]):
                                     continue
                             else:
-                                if _equal(self._data[i], self._data[i - delta]):
+                                if equals(self._data[i], self._data[i - delta]):
                                     continue
                         self._keys[i].notify()
                     for i in range(stop + delta):
                         if i >= delta:
                             if i >= start:
-                                if _equal(self._data[i - self._length - delta], target[i - start]):
+                                if equals(self._data[i - self._length - delta], target[i - start]):
                                     continue
                             else:
-                                if _equal(self._data[i - self._length - delta], self._data[i - self._length]):
+                                if equals(self._data[i - self._length - delta], self._data[i - self._length]):
                                     continue
                         self._keys[i - self._length - delta].notify()
 
@@ -212,19 +220,19 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
                     for i in range(start, self._length):
                         if i < self._length + delta:
                             if i - start < len(target):
-                                if _equal(self._data[i], target[i - start]):
+                                if equals(self._data[i], target[i - start]):
                                     continue
                             else:
-                                if _equal(self._data[i], self._data[i - delta]):
+                                if equals(self._data[i], self._data[i - delta]):
                                     continue
                         self._keys[i].notify()
                     for i in range(stop):
                         if i >= -delta:
                             if 0 <= i - start < len(target):
-                                if _equal(self._data[i - self._length], target[i - start]):
+                                if equals(self._data[i - self._length], target[i - start]):
                                     continue
                             else:
-                                if _equal(self._data[i - self._length], self._data[i - self._length + delta]):
+                                if equals(self._data[i - self._length], self._data[i - self._length + delta]):
                                     continue
                         self._keys[i - self._length].notify()
 
@@ -237,7 +245,7 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
                 else:
                     for i in range(start, stop):
                         original = self._data[i]
-                        if not _equal(original, target[i - start]):
+                        if not equals(original, target[i - start]):
                             self._data[i] = target[i - start]
                             self._keys[i].notify()
                             self._keys[i - self._length].notify()
@@ -319,17 +327,86 @@ class ReactiveSequenceProxy[T](MutableSequence[T]):
 
 
 class ReactiveSequence[T](ReactiveSequenceProxy[T]):
-    def __init__(self, initial: Sequence[T] | None = None, check_equality=True, *, context: Context | None = None):
-        super().__init__([*initial] if initial is not None else [], check_equality, context=context)
+    def __init__(self, initial: Sequence[T] | None = None, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
+        super().__init__([*initial] if initial is not None else [], check_equality, context=context, equals=equals)
+
+
+class MappedSequence[T, R](ReactiveSequence[R]):
+    """
+    `[fn(x) for x in source]`, kept up to date element by element. Only the replaced items of the source are passed to `fn` again,
+    and only the changed indices of the output are notified.
+
+    `fn` runs untracked, so it should only depend on its argument. Call `dispose` to stop following the source.
+    """
+
+    def __init__(self, source: ReactiveSequenceProxy[T], fn: Callable[[T], R], check_equality=True, *, equals: Equality | None = None):
+        self.source = source
+        self.fn = fn
+        self._source_data = source._data  # noqa: SLF001
+        self._source_equals = source._equals if source._check_equality else None  # noqa: SLF001
+        with source.context.untrack():
+            super().__init__([fn(x) for x in self._source_data], check_equality, context=source.context, equals=equals)
+        source._listeners.append(self._update)  # noqa: SLF001
+
+    def _update(self, start: int, stop: int, items: list[T]):
+        fn = self.fn
+        with self.context.untrack():
+            if (equals := self._source_equals) is not None and len(items) == stop - start:  # in-place replacement, equal items keep their results
+                old = self._source_data
+                values = [self._data[i] if equals(old[i], x) else fn(x) for i, x in enumerate(items, start)]
+            else:
+                values = [fn(x) for x in items]
+        self._replace(slice(start, stop), values)
+
+    def dispose(self):
+        self.source._listeners.remove(self._update)  # noqa: SLF001
+
+
+class FilteredSequence[T](ReactiveSequence[T]):
+    """
+    `[x for x in source if predicate(x)]`, kept up to date element by element. Only the replaced items of the source are passed to `predicate` again.
+
+    `predicate` runs untracked, so it should only depend on its argument. Call `dispose` to stop following the source.
+    """
+
+    def __init__(self, source: ReactiveSequenceProxy[T], predicate: Callable[[T], object], check_equality=True, *, equals: Equality | None = None):
+        self.source = source
+        self.predicate = predicate
+        data = source._data  # noqa: SLF001
+        with source.context.untrack():
+            self._kept = [bool(predicate(x)) for x in data]
+        super().__init__([x for x, kept in zip(data, self._kept, strict=True) if kept], check_equality, context=source.context, equals=equals or source._equals)  # noqa: SLF001
+        source._listeners.append(self._update)  # noqa: SLF001
+
+    def _update(self, start: int, stop: int, items: list[T]):
+        predicate = self.predicate
+        with self.context.untrack():
+            kept = [bool(predicate(x)) for x in items]
+        offset = sum(self._kept[:start])
+        removed = sum(self._kept[start:stop])
+        self._kept[start:stop] = kept
+        self._replace(slice(offset, offset + removed), [x for x, k in zip(items, kept, strict=True) if k])
+
+    def dispose(self):
+        self.source._listeners.remove(self._update)  # noqa: SLF001
+
+
+def map_sequence[T, R](source: ReactiveSequenceProxy[T], fn: Callable[[T], R], check_equality=True, *, equals: Equality | None = None) -> MappedSequence[T, R]:
+    return MappedSequence(source, fn, check_equality, equals=equals)
+
+
+def filter_sequence[T](source: ReactiveSequenceProxy[T], predicate: Callable[[T], object], check_equality=True, *, equals: Equality | None = None) -> FilteredSequence[T]:
+    return FilteredSequence(source, predicate, check_equality, equals=equals)
 
 
 # TODO: use WeakKeyDictionary to avoid memory leaks
 
 
-def reactive_object_proxy[T](initial: T, check_equality=True, *, context: Context | None = None) -> T:
+def reactive_object_proxy[T](initial: T, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> T:
     context = context or default_context
+    equals = equals or equal
 
-    names = ReactiveMappingProxy(initial.__dict__, check_equality, context=context)  # TODO: support classes with `__slots__`
+    names = ReactiveMappingProxy(initial.__dict__, check_equality, context=context, equals=equals)  # TODO: support classes with `__slots__`
     _iter = names._iter  # noqa: SLF001
     _keys: defaultdict[str, Signal[bool | None]] = names._keys  # noqa: SLF001  # type: ignore
     # true for instance attributes, false for non-existent attributes, None for class attributes
@@ -355,7 +432,7 @@ def reactive_object_proxy[T](initial: T, check_equality=True, *, context: Contex
 
         def __setattr__(self, key: str, value):
             if _keys[key]._value is not False:  # noqa: SLF001
-                should_notify = not check_equality or not _equal(getattr(initial, key), value)
+                should_notify = not check_equality or not equals(getattr(initial, key), value)
                 setattr(initial, key, value)
                 if should_notify:
                     _keys[key].notify()
@@ -382,7 +459,7 @@ def reactive_object_proxy[T](initial: T, check_equality=True, *, context: Contex
 
             def __call__(self, *args, **kwargs):
                 # TODO: refactor this because making a new class whenever constructing a new instance is wasteful
-                return reactive(initial(*args, **kwargs), check_equality, context=context)  # type: ignore
+                return reactive(initial(*args, **kwargs), check_equality, context=context, equals=equals)  # type: ignore
 
             # it seems that __str__ and __repr__ are not looked up on the class, so we have to define them here
             # note that this do loses reactivity but probably nobody needs reactive stringifying of classes themselves
@@ -413,37 +490,37 @@ def reactive_object_proxy[T](initial: T, check_equality=True, *, context: Contex
 
 
 @overload
-def reactive[K, V](value: MutableMapping[K, V], check_equality=True, *, context: Context | None = None) -> ReactiveMappingProxy[K, V]: ...  # type: ignore
+def reactive[K, V](value: MutableMapping[K, V], check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> ReactiveMappingProxy[K, V]: ...  # type: ignore
 @overload
-def reactive[K, V](value: Mapping[K, V], check_equality=True, *, context: Context | None = None) -> ReactiveMapping[K, V]: ...
+def reactive[K, V](value: Mapping[K, V], check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> ReactiveMapping[K, V]: ...
 @overload
 def reactive[T](value: MutableSet[T], check_equality=True, *, context: Context | None = None) -> ReactiveSetProxy[T]: ...  # type: ignore
 @overload
 def reactive[T](value: Set[T], check_equality=True, *, context: Context | None = None) -> ReactiveSet[T]: ...
 @overload
-def reactive[T](value: MutableSequence[T], check_equality=True, *, context: Context | None = None) -> ReactiveSequenceProxy[T]: ...  # type: ignore
+def reactive[T](value: MutableSequence[T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> ReactiveSequenceProxy[T]: ...  # type: ignore
 @overload
-def reactive[T](value: Sequence[T], check_equality=True, *, context: Context | None = None) -> ReactiveSequence[T]: ...
+def reactive[T](value: Sequence[T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> ReactiveSequence[T]: ...
 @overload
-def reactive[T](value: T, check_equality=True, *, context: Context | None = None) -> T: ...
+def reactive[T](value: T, check_equality=True, *, context: Context | None = None, equals: Equality | None = None) -> T: ...
 
 
-def reactive(value: Mapping | Set | Sequence | Any, check_equality=True, *, context: Context | None = None):
+def reactive(value: Mapping | Set | Sequence | Any, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
     match value:
         case MutableMapping():
-            return ReactiveMappingProxy(value, check_equality, context=context)
+            return ReactiveMappingProxy(value, check_equality, context=context, equals=equals)
         case Mapping():
-            return ReactiveMapping(value, check_equality, context=context)
+            return ReactiveMapping(value, check_equality, context=context, equals=equals)
         case MutableSet():
             return ReactiveSetProxy(value, check_equality, context=context)
         case Set():
             return ReactiveSet(value, check_equality, context=context)
         case MutableSequence():
-            return ReactiveSequenceProxy(value, check_equality, context=context)
+            return ReactiveSequenceProxy(value, check_equality, context=context, equals=equals)
         case Sequence():
-            return ReactiveSequence(value, check_equality, context=context)
+            return ReactiveSequence(value, check_equality, context=context, equals=equals)
         case _:
-            return reactive_object_proxy(value, check_equality, context=context)
+            return reactive_object_proxy(value, check_equality, context=context, equals=equals)
 
 
 # TODO: implement deep_reactive, lazy_reactive, etc.
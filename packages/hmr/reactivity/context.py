@@ -2,43 +2,144 @@ from __future__ import annotations
 
 from collections.abc import Iterable
 from contextlib import contextmanager
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
 from functools import partial
-from typing import TYPE_CHECKING, NamedTuple
+from threading import RLock, local
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 if TYPE_CHECKING:
-    from .primitives import BaseComputation
+    from .primitives import BaseComputation, Owner, Subscribable
+    from .tracing import Tracer
+
+
+class Stack[T]:
+    """
+    A stack of immutable `(item, rest)` cells. Copies share the cells, so copying is O(1) and pushing onto a copy doesn't affect the original.
+
+    Hot paths read `head` directly: `None` when empty, otherwise `head[0]` is the top item.
+    Indexing, `len()` and `in` walk the cells like a linked list, so `stack[-1]` is O(1) but `stack[0]` is O(n).
+    """
+
+    __slots__ = ("head",)
+
+    def __init__(self, head: tuple[T, Any] | None = None):
+        self.head = head
+
+    def append(self, item: T):
+        self.head = (item, self.head)
+
+    def pop(self) -> T:
+        assert self.head is not None
+        item, self.head = self.head
+        return item
+
+    def copy(self):
+        return Stack(self.head)
+
+    def __bool__(self):
+        return self.head is not None
+
+    def __iter__(self):
+        items = []
+        node = self.head
+        while node is not None:
+            items.append(node[0])
+            node = node[1]
+        return reversed(items)  # bottom first, like a list
+
+    def __len__(self):
+        size = 0
+        node = self.head
+        while node is not None:
+            size += 1
+            node = node[1]
+        return size
+
+    def __getitem__(self, index: int) -> T:
+        if index >= 0:
+            index -= len(self)
+        node = self.head
+        while node is not None and index < -1:
+            node = node[1]
+            index += 1
+        if node is None or index >= 0:
+            raise IndexError("stack index out of range")  # noqa: TRY003
+        return node[0]
+
+    def __contains__(self, item: object):
+        node = self.head
+        while node is not None:
+            if node[0] is item or node[0] == item:
+                return True
+            node = node[1]
+        return False
+
+    def __eq__(self, other: object):
+        return [*self] == [*other] if isinstance(other, Stack | list) else NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return f"Stack({[*self]!r})"
 
 
 class Context(NamedTuple):
-    current_computations: list[BaseComputation]
+    current_computations: Stack[BaseComputation]
     batches: list[Batch]
-    async_execution_context: ContextVar[Context | None]
+    tracked_dependencies: Stack[set[Subscribable]]
+    owners: Stack[Owner]
+    tracers: list[Tracer]
+    async_execution_context: ContextVar[Context | None] | ThreadLocalContextVar
+    lock: RLock | None = None
+    """
+    Only thread-safe contexts have a lock. It is held while a synchronous computation runs and while a batch flushes,
+    so synchronous work on a thread-safe context is serialized across threads rather than run in parallel.
+    """
+
+    def add_tracer[T: Tracer](self, tracer: T) -> T:
+        self.tracers.append(tracer)
+        return tracer
+
+    def remove_tracer(self, tracer: Tracer):
+        self.tracers.remove(tracer)
 
     def schedule_callbacks(self, callbacks: Iterable[BaseComputation]):
-        self.batches[-1].callbacks.update(callbacks)
+        scheduled = self.batches[-1].callbacks
+        for computation in callbacks:
+            if isinstance(computation, BaseDerived):
+                computation._mark_dirty()  # noqa: SLF001  # mark eagerly so that reads before the flush won't see a stale value
+            scheduled.add(computation)
 
     @contextmanager
     def enter(self, computation: BaseComputation):
+        if (lock := self.lock) is not None and not isinstance(computation, AsyncDerived | AsyncEffect):  # async ones would hold it across awaits
+            lock.acquire()
+        else:
+            lock = None
         old_dependencies = {*computation.dependencies}
-        computation.dispose()
+        tracked: set[Subscribable] = set()
+        if (scope := computation._scope) is not None:  # noqa: SLF001
+            scope.dispose()  # computations created in the last run
+            self.owners.append(scope)
         self.current_computations.append(computation)
+        self.tracked_dependencies.append(tracked)
+        keep_old_dependencies = False
+        if tracers := self.tracers:
+            timestamp = perf_counter_ns()
+            for tracer in tracers:
+                tracer.on_start(computation, timestamp)
         try:
             yield
         except BaseException:
-            # For backward compatibility, we restore old dependencies only if some dependencies are lost after an exception.
+            # For backward compatibility, we keep old dependencies only if no new dependencies are found before an exception.
             # This behavior may be configurable in the future.
-            if computation.dependencies.issubset(old_dependencies):
-                for dep in old_dependencies:
-                    dep.subscribers.add(computation)
-                computation.dependencies.update(old_dependencies)
+            keep_old_dependencies = tracked.issubset(old_dependencies)
             raise
         else:
-            if not computation.dependencies and (strategy := computation.reactivity_loss_strategy) != "ignore":
+            if not tracked and (strategy := computation.reactivity_loss_strategy) != "ignore":
                 if strategy == "restore" and old_dependencies:
-                    for dep in old_dependencies:
-                        dep.subscribers.add(computation)
-                    computation.dependencies.update(old_dependencies)
+                    keep_old_dependencies = True
                     return
                 from pathlib import Path
                 from sysconfig import get_path
@@ -47,8 +148,36 @@ class Context(NamedTuple):
                 msg = "lost all its dependencies" if old_dependencies else "has no dependencies"
                 warn(f"{computation} {msg} and will never be auto-triggered.", RuntimeWarning, skip_file_prefixes=(str(Path(__file__).parent), s := get_path("stdlib"), str(Path(s).resolve())))
         finally:
-            last = self.current_computations.pop()
-            assert last is computation  # sanity check
+            try:
+                last = self.current_computations.pop()
+                self.tracked_dependencies.pop()
+                assert last is computation  # sanity check
+                if scope is not None:
+                    self.owners.pop()
+                if keep_old_dependencies:
+                    tracked |= old_dependencies
+                else:
+                    # stable edges are left in place, only the ones not read in this run are removed
+                    dependencies = computation.dependencies
+                    for dep in old_dependencies - tracked:
+                        if dep in dependencies:  # may have been unsubscribed manually during the run
+                            dep.unsubscribe(computation)
+                computation.height = max((dep.height for dep in tracked), default=-1) + 1
+                if tracers:
+                    timestamp = perf_counter_ns()
+                    for tracer in tracers:
+                        tracer.on_end(computation, timestamp, len(tracked))
+            finally:
+                if lock is not None:
+                    lock.release()
+
+    def root(self):
+        """
+        Create an ownership scope. Computations created inside `with context.root() as root:` are owned by `root`, and `root.dispose()` disposes all of them.
+
+        Owned computations own the computations created during their runs in turn, which are disposed before each rerun.
+        """
+        return Owner(self)
 
     @property
     def batch(self):
@@ -76,26 +205,78 @@ class Context(NamedTuple):
 
     @contextmanager
     def untrack(self):
-        computations = self.current_computations[:]
-        self.current_computations.clear()
+        stack = self.current_computations
+        head, stack.head = stack.head, None
         try:
             yield
         finally:
-            self.current_computations[:] = computations
+            stack.head = head
 
     @property
     def leaf(self):
         return self.async_execution_context.get() or self
 
     def fork(self):
-        self.async_execution_context.set(Context(self.current_computations[:], self.batches[:], self.async_execution_context))
+        # Batches are not inherited: the ones open now may be flushed and closed while the forked task is still running.
+        base = self if self.lock is None else self.async_execution_context.thread_root()  # type: ignore
+        _enable_leaf_lookup()
+        self.async_execution_context.set(Context(base.current_computations.copy(), [], base.tracked_dependencies.copy(), base.owners.copy(), self.tracers, self.async_execution_context, self.lock))
+
+
+class ThreadLocalContextVar:
+    """
+    Used as the `async_execution_context` of thread-safe contexts.
+
+    Like a `ContextVar`, but when unset it falls back to a separate `Context` for each thread, so that threads don't share tracking stacks and batches.
+    """
+
+    __slots__ = ("_local", "_var", "root")
+
+    def __init__(self, root: Context | None = None):
+        self._var = ContextVar[Context | None]("current context", default=None)
+        self._local = local()
+        self.root = root
+
+    def get(self):
+        return self._var.get() or self.thread_root()
+
+    def set(self, value: Context | None):
+        return self._var.set(value)
+
+    def reset(self, token: Token[Context | None]):
+        self._var.reset(token)
+
+    def thread_root(self) -> Context:
+        try:
+            return self._local.context
+        except AttributeError:
+            root = self.root
+            assert root is not None
+            self._local.context = context = Context(Stack(), [], Stack(), Stack(), root.tracers, self, root.lock)
+            return context
+
+
+def new_context(*, thread_safe=False):
+    """
+    Create an isolated reactive context.
 
+    A `thread_safe` context is thread-safe but serialized. It can be used from several threads at once, and each thread gets its own tracking stacks and batches.
+    Synchronous computations and batch flushes all take `Context.lock`, so they run one at a time and don't scale across cores.
+    Reading clean values and writing signals that nothing depends on don't take any lock.
 
-def new_context():
-    return Context([], [], async_execution_context=ContextVar("current context", default=None))
+    Async computations and the effects run by the workers of a parallel `Batch` flush run outside that lock. They are what can run concurrently,
+    and the edges they create or drop are protected by a fixed pool of striped locks instead. Deriveds refreshed by those workers still take one shared lock.
+    """
+    if not thread_safe:
+        return Context(Stack(), [], Stack(), Stack(), [], async_execution_context=ContextVar("current context", default=None))
+    _enable_leaf_lookup()
+    var = ThreadLocalContextVar()
+    var.root = context = Context(Stack(), [], Stack(), Stack(), [], var, RLock())
+    var._local.context = context  # noqa: SLF001  # the creating thread uses the root itself
+    return context
 
 
 default_context = new_context()
 
 from .async_primitives import AsyncDerived, AsyncEffect
-from .primitives import Batch, Derived, Effect, Signal
+from .primitives import BaseDerived, Batch, Derived, Effect, Owner, Signal, _enable_leaf_lookup
@@ -0,0 +1,99 @@
+from collections.abc import Callable, Mapping, Sequence, Set
+from typing import Any, overload
+
+type Equality = Callable[[Any, Any], bool]
+
+_registry: dict[type | str, Equality] = {}
+_resolved: dict[type, Equality] = {}
+
+
+@overload
+def register_equality[F: Equality](cls: type | str, equals: F, /) -> F: ...
+@overload
+def register_equality(cls: type | str, /) -> Callable[[Equality], Equality]: ...
+
+
+def register_equality(cls: type | str, equals: Equality | None = None, /):
+    """
+    Register how values of `cls` (and its subclasses) are compared by `equal`. Usable as a decorator.
+
+    `cls` can also be a qualified name like `"numpy.ndarray"`, so that the library doesn't have to be imported beforehand.
+    Public aliases work too: `"pandas.DataFrame"` matches `pandas.core.frame.DataFrame`, as names are also tried with the top-level package only.
+    """
+
+    def register[F: Equality](equals: F, /) -> F:
+        _registry[cls] = equals
+        _resolved.clear()
+        return equals
+
+    return register if equals is None else register(equals)
+
+
+def _resolve(cls: type) -> Equality:
+    for base in cls.__mro__:
+        module = base.__module__
+        if (equals := _registry.get(base) or _registry.get(f"{module}.{base.__qualname__}") or _registry.get(f"{module.partition('.')[0]}.{base.__qualname__}")) is not None:
+            break
+    else:
+        equals = default_equal
+    _resolved[cls] = equals
+    return equals
+
+
+def equal(a, b) -> bool:
+    """Compare two values with the strategy registered for the type of `a`. This is the default for every `check_equality`."""
+    if a is b:
+        return True
+    return (_resolved.get(type(a)) or _resolve(type(a)))(a, b)
+
+
+def default_equal(a, b) -> bool:
+    try:
+        return bool(a == b)
+    except (ValueError, RuntimeError, TypeError):  # truth values of array-likes are ambiguous, treat them as changed
+        return False
+
+
+def identical(a, b) -> bool:
+    return a is b
+
+
+def shallow_equal(a, b) -> bool:
+    """Same type and same items, where items (or attributes) are compared by identity."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    match a:
+        case str() | bytes():
+            return a == b
+        case Mapping():
+            return len(a) == len(b) and all(key in b and value is b[key] for key, value in a.items())
+        case Set():
+            return a == b
+        case Sequence():
+            return len(a) == len(b) and all(x is y for x, y in zip(a, b, strict=True))
+        case _ if hasattr(a, "__dict__"):
+            return shallow_equal(vars(a), vars(b))
+    return default_equal(a, b)
+
+
+def array_equal(a, b) -> bool:
+    """For NumPy arrays and alike: same type, shape, dtype and underlying bytes, so unlike `==`, NaNs are equal to themselves."""
+    if type(a) is not type(b) or a.shape != b.shape or a.dtype != b.dtype:
+        return False
+    if a.dtype.hasobject:
+        return bool((a == b).all())
+    if a.itemsize in (1, 2, 4, 8) and a.flags.c_contiguous and b.flags.c_contiguous:
+        word = f"u{a.itemsize}"  # compare the buffers word by word without copying them
+        return bool((a.view(word) == b.view(word)).all())
+    return a.tobytes() == b.tobytes()
+
+
+def _pandas_equal(a, b) -> bool:
+    return type(a) is type(b) and a.equals(b)
+
+
+register_equality("numpy.ndarray", array_equal)
+register_equality("pandas.DataFrame", _pandas_equal)
+register_equality("pandas.Series", _pandas_equal)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from collections import Counter, deque
+from collections.abc import Iterable
+
+from .context import Context, default_context
+from .primitives import BaseComputation, Subscribable
+from .tracing import label
+
+type Node = Subscribable | BaseComputation
+
+
+def kind(node: Node) -> str:
+    """`"source"` for plain subscribables, `"derived"` for computations that can be subscribed to, and `"effect"` for the rest."""
+    if isinstance(node, BaseComputation):
+        return "derived" if isinstance(node, Subscribable) else "effect"
+    return "source"
+
+
+def _neighbors(node: Node) -> Iterable[Node]:
+    if isinstance(node, Subscribable) and node._subscribers:  # noqa: SLF001  # don't allocate empty containers while inspecting
+        yield from node._subscribers  # noqa: SLF001
+    if isinstance(node, BaseComputation) and node._dependencies:  # noqa: SLF001
+        yield from node._dependencies  # noqa: SLF001
+
+
+def _nodes_in(context: Context) -> list[Node]:
+    import gc
+
+    return [obj for obj in gc.get_objects() if isinstance(obj, Subscribable | BaseComputation) and getattr(obj, "context", None) is context]
+
+
+class Graph:
+    """
+    A snapshot of the dependency graph. Edges point from a dependency to its subscriber.
+
+    Nodes are held strongly, so don't keep a snapshot around longer than needed.
+    """
+
+    __slots__ = ("edges", "nodes")
+
+    def __init__(self, nodes: Iterable[Node]):
+        self.nodes: list[Node] = []
+
+        seen = set()
+        queue = deque(nodes)
+        while queue:
+            node = queue.popleft()
+            if node in seen:
+                continue
+            seen.add(node)
+            self.nodes.append(node)
+            queue.extend(_neighbors(node))
+
+        edges = set()
+        for node in self.nodes:
+            if isinstance(node, Subscribable) and node._subscribers:  # noqa: SLF001
+                edges.update((node, sub) for sub in node._subscribers)  # noqa: SLF001
+            if isinstance(node, BaseComputation) and node._dependencies:  # noqa: SLF001
+                edges.update((dep, node) for dep in node._dependencies)  # noqa: SLF001
+        index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges: list[tuple[Node, Node]] = sorted(edges, key=lambda edge: (index[edge[0]], index[edge[1]]))
+
+    def fan_out(self, node: Node):
+        return len(node._subscribers or ()) if isinstance(node, Subscribable) else 0  # noqa: SLF001
+
+    @property
+    def max_fan_out(self) -> tuple[Node | None, int]:
+        """The node with the most subscribers, and their number."""
+        return max(((node, self.fan_out(node)) for node in self.nodes), key=lambda item: item[1], default=(None, 0))
+
+    @property
+    def longest_path(self) -> list[Node]:
+        """The longest chain of dependencies, from a source to a sink. Nodes on cycles are ignored."""
+        subscribers: dict[Node, list[Node]] = {node: [] for node in self.nodes}
+        in_degree = dict.fromkeys(self.nodes, 0)
+        for dep, sub in self.edges:
+            subscribers[dep].append(sub)
+            in_degree[sub] += 1
+
+        queue = deque(node for node, degree in in_degree.items() if degree == 0)
+        previous: dict[Node, Node | None] = dict.fromkeys(queue)
+        depth = dict.fromkeys(queue, 1)
+        last = None
+        while queue:
+            node = queue.popleft()
+            if last is None or depth[node] > depth[last]:
+                last = node
+            for sub in subscribers[node]:
+                if depth[node] + 1 > depth.get(sub, 0):
+                    depth[sub] = depth[node] + 1
+                    previous[sub] = node
+                in_degree[sub] -= 1
+                if in_degree[sub] == 0:
+                    queue.append(sub)
+
+        path = []
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        return path[::-1]
+
+    def stats(self):
+        node, fan_out = self.max_fan_out
+        return {
+            "nodes": len(self.nodes),
+            "edges": len(self.edges),
+            "kinds": dict(Counter(map(kind, self.nodes))),
+            "longest_path": [label(node) for node in self.longest_path],
+            "max_fan_out": {"node": None if node is None else label(node), "subscribers": fan_out},
+        }
+
+    def as_dict(self):
+        index = {node: i for i, node in enumerate(self.nodes)}
+        return {
+            "nodes": [{"id": i, "kind": kind(node), "label": label(node)} for i, node in enumerate(self.nodes)],
+            "edges": [[index[dep], index[sub]] for dep, sub in self.edges],
+            "stats": self.stats(),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_dot(self, name="reactivity"):
+        shapes = {"source": "ellipse", "derived": "box", "effect": "diamond"}
+        index = {node: i for i, node in enumerate(self.nodes)}
+        lines = [f"digraph {json.dumps(name)} {{"]
+        lines.extend(f"  n{i} [label={json.dumps(label(node))}, shape={shapes[kind(node)]}];" for i, node in enumerate(self.nodes))
+        lines.extend(f"  n{index[dep]} -> n{index[sub]};" for dep, sub in self.edges)
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def inspect_graph(*roots: Node, context: Context | None = None):
+    """
+    Collect the graph reachable from `roots` (following edges in both directions).
+
+    Without roots, every live node bound to `context` is collected by scanning the garbage collector, which is slow but finds leaked subscriptions too.
+    """
+    return Graph(roots or _nodes_in(context or default_context))
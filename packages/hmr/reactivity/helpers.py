@@ -1,11 +1,17 @@
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import partial
+from time import monotonic
 from typing import TYPE_CHECKING, Self, overload
 
-from .context import Context
-from .primitives import BaseComputation, Derived, DescriptorMixin, Subscribable
+from .context import Context, default_context
+from .equality import Equality, equal
+from .primitives import BaseComputation, Derived, DescriptorMixin, Effect, Subscribable
 
 
 class Memoized[T](Subscribable, BaseComputation[T]):
+    __slots__ = ("__dict__", "_dependencies", "cached_value", "fn", "height", "is_stale")
+
     def __init__(self, fn: Callable[[], T], *, context: Context | None = None):
         super().__init__(context=context)
         self.fn = fn
@@ -82,14 +88,15 @@ class MemoizedMethod[T, I](DescriptorMixin[Memoized[T]]):
 
 
 class DerivedProperty[T, I](DescriptorMixin[Derived[T]]):
-    def __init__(self, method: Callable[[I], T], check_equality=True, *, context: Context | None = None):
+    def __init__(self, method: Callable[[I], T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         super().__init__()
         self.method = method
         self.check_equality = check_equality
         self.context = context
+        self.equals = equals
 
     def _new(self, instance):
-        return Derived(self.method.__get__(instance), self.check_equality, context=self.context)
+        return Derived(self.method.__get__(instance), self.check_equality, context=self.context, equals=self.equals)
 
     @overload
     def __get__(self, instance: None, owner: type[I]) -> Self: ...
@@ -105,14 +112,15 @@ class DerivedProperty[T, I](DescriptorMixin[Derived[T]]):
 
 
 class DerivedMethod[T, I](DescriptorMixin[Derived[T]]):
-    def __init__(self, method: Callable[[I], T], check_equality=True, *, context: Context | None = None):
+    def __init__(self, method: Callable[[I], T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         super().__init__()
         self.method = method
         self.check_equality = check_equality
         self.context = context
+        self.equals = equals
 
     def _new(self, instance):
-        return Derived(self.method.__get__(instance), self.check_equality, context=self.context)
+        return Derived(self.method.__get__(instance), self.check_equality, context=self.context, equals=self.equals)
 
     @overload
     def __get__(self, instance: None, owner: type[I]) -> Self: ...
@@ -127,6 +135,215 @@ class DerivedMethod[T, I](DescriptorMixin[Derived[T]]):
     __delete__ = __set__ = _not_implemented
 
 
+class _FamilyMember:
+    __slots__ = ()
+
+    family: "BaseFamily"
+    key: Hashable
+
+    def unsubscribe(self, computation: BaseComputation):
+        super().unsubscribe(computation)  # type: ignore
+        if self.family.evict_unobserved and not self._subscribers:  # type: ignore
+            self.family._evict(self.key)  # noqa: SLF001
+
+
+class _FamilyDerived[T](_FamilyMember, Derived[T]):
+    __slots__ = ()
+
+
+class _FamilyMemoized[T](_FamilyMember, Memoized[T]):
+    __slots__ = ()
+
+
+_kwargs_mark = object()  # separates keyword arguments in family keys, like `functools._make_key` does
+
+
+class BaseFamily[T, N: Subscribable](DescriptorMixin["BaseFamily[T, N]"]):
+    """
+    Maps arguments to lazily created nodes. Calling the family reads the node for those arguments.
+
+    Nodes that still have subscribers are never evicted. Evicted nodes are disposed, so that their sources don't keep them alive.
+    """
+
+    def __init__(self, fn: Callable[..., T], *, max_size: int | None = None, ttl: float | None = None, evict_unobserved=False, context: Context | None = None, timer: Callable[[], float] = monotonic):
+        super().__init__()
+        self.fn = fn
+        self.max_size = max_size
+        """Evict the least recently used nodes beyond this size."""
+        self.ttl = ttl
+        """Evict nodes not accessed for this many seconds (measured by `timer`)."""
+        self.evict_unobserved = evict_unobserved
+        """Evict a node as soon as it loses its last subscriber."""
+        self.context = context
+        self.timer = timer
+        self.nodes: OrderedDict[Hashable, N] = OrderedDict()
+        self._accessed: dict[Hashable, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _create(self, fn: Callable[[], T]) -> N: ...
+
+    def node(self, *args, **kwargs) -> N:
+        key = (*args, _kwargs_mark, *sorted(kwargs.items())) if kwargs else args
+        nodes = self.nodes
+        if (node := nodes.get(key)) is not None:
+            self.hits += 1
+            nodes.move_to_end(key)
+        else:
+            self.misses += 1
+            node = nodes[key] = self._create(partial(self.fn, *args, **kwargs))
+            node.family = self  # type: ignore
+            node.key = key  # type: ignore
+        if self.ttl is not None:
+            self._accessed[key] = now = self.timer()
+            self._expire(now)
+        if self.max_size is not None and len(nodes) > self.max_size:
+            self._shrink()
+        return node
+
+    def __call__(self, *args, **kwargs) -> T:
+        return self.node(*args, **kwargs)()  # type: ignore
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _evict(self, key: Hashable):
+        if (node := self.nodes.pop(key, None)) is not None:
+            self._accessed.pop(key, None)
+            self.evictions += 1
+            node.dispose()  # type: ignore
+
+    def _expire(self, now: float):
+        assert self.ttl is not None
+        for key, node in [*self.nodes.items()]:  # least recently used first
+            if now - self._accessed[key] < self.ttl:
+                break
+            if not node._subscribers:  # noqa: SLF001
+                self._evict(key)
+
+    def _shrink(self):
+        assert self.max_size is not None
+        excess = len(self.nodes) - self.max_size
+        for key, node in [*self.nodes.items()][:-1]:  # the one just accessed is about to be read
+            if excess <= 0:
+                break
+            if not node._subscribers:  # noqa: SLF001
+                self._evict(key)
+                excess -= 1
+
+    def clear(self):
+        for key in [*self.nodes]:
+            self._evict(key)
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> Self: ...
+    @overload
+    def __get__(self, instance: object, owner: type) -> "BaseFamily[T, N]": ...
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self.find(instance)
+
+    __delete__ = __set__ = _not_implemented
+
+
+class DerivedFamily[T](BaseFamily[T, Derived[T]]):
+    def __init__(
+        self,
+        fn: Callable[..., T],
+        check_equality=True,
+        *,
+        max_size: int | None = None,
+        ttl: float | None = None,
+        evict_unobserved=False,
+        context: Context | None = None,
+        equals: Equality | None = None,
+        timer: Callable[[], float] = monotonic,
+    ):
+        super().__init__(fn, max_size=max_size, ttl=ttl, evict_unobserved=evict_unobserved, context=context, timer=timer)
+        self.check_equality = check_equality
+        self.equals = equals
+
+    def _create(self, fn):
+        return _FamilyDerived(fn, self.check_equality, context=self.context, equals=self.equals)
+
+    def _new(self, instance):
+        return DerivedFamily(
+            self.fn.__get__(instance), self.check_equality, max_size=self.max_size, ttl=self.ttl, evict_unobserved=self.evict_unobserved, context=self.context, equals=self.equals, timer=self.timer
+        )
+
+
+class MemoizedFamily[T](BaseFamily[T, Memoized[T]]):
+    def _create(self, fn):
+        return _FamilyMemoized(fn, context=self.context)
+
+    def _new(self, instance):
+        return MemoizedFamily(self.fn.__get__(instance), max_size=self.max_size, ttl=self.ttl, evict_unobserved=self.evict_unobserved, context=self.context, timer=self.timer)
+
+
+class _Bucket(Subscribable):
+    __slots__ = ("key", "selector")
+
+    def __init__(self, selector: "Selector", key: Hashable):
+        super().__init__(context=selector.context)
+        self.selector = selector
+        self.key = key
+
+    @property
+    def height(self):  # so that readers run after the selector has moved on
+        return self.selector.effect.height
+
+    def unsubscribe(self, computation: BaseComputation):
+        super().unsubscribe(computation)
+        if not self._subscribers and self.selector.buckets.get(self.key) is self:
+            del self.selector.buckets[self.key]
+
+
+class Selector[K: Hashable]:
+    """
+    Lets many readers check whether their key is the selected one. `is_selected(key)` only subscribes to that key,
+    so when the source changes from `a` to `b`, only the readers of `a` and `b` are notified.
+    """
+
+    def __init__(self, source: Callable[[], K], *, context: Context | None = None):
+        self.source = source
+        self.context = context or default_context
+        self.buckets: dict[K, _Bucket] = {}
+        self._value: K
+        self.effect = Effect(self._update, context=context)
+
+    def _update(self):
+        value = self.source()
+        try:
+            previous = self._value
+        except AttributeError:  # the first run
+            self._value = value
+            return
+        if equal(previous, value):
+            return
+        self._value = value
+        with self.context.batch(force_flush=False):
+            if (bucket := self.buckets.get(previous)) is not None:
+                bucket.notify()
+            if (bucket := self.buckets.get(value)) is not None:
+                bucket.notify()
+
+    def is_selected(self, key: K) -> bool:
+        if not self.context.leaf.current_computations:
+            return self._value == key
+        if (bucket := self.buckets.get(key)) is None:
+            bucket = self.buckets[key] = _Bucket(self, key)
+        bucket.track()
+        return self._value == key
+
+    __call__ = is_selected
+
+    def dispose(self):
+        self.effect.dispose()
+
+
 if TYPE_CHECKING:
     from typing_extensions import deprecated  # noqa: UP035
 
@@ -42,8 +42,7 @@ class NamespaceProxy(Proxy):
         super().__init__(initial, check_equality, context=context)
 
     def _signal(self, value=False):
-        self.module.load.subscribers.add(signal := Name(value, self._check_equality, context=self.context))
-        signal.dependencies.add(self.module.load)
+        self.module.load.subscribe(signal := Name(value, self._check_equality, context=self.context))
         return signal
 
     def __getitem__(self, key):
@@ -53,8 +52,7 @@ class NamespaceProxy(Proxy):
             signal = self._keys[key]
             if self.module.load in signal.subscribers:
                 # a module's loader shouldn't subscribe its variables
-                signal.subscribers.remove(self.module.load)
-                self.module.load.dependencies.remove(signal)
+                signal.unsubscribe(self.module.load)
 
 
 STATIC_ATTRS = frozenset(("__path__", "__dict__", "__spec__", "__name__", "__file__", "__loader__", "__package__", "__cached__"))
@@ -111,8 +109,7 @@ class ReactiveModule(ModuleType):
             for dep in list(load.dependencies):
                 if isinstance(dep, Derived) and ismethod(dep.fn) and isinstance(dep.fn.__self__, ReactiveModule) and dep.fn.__func__ is load.fn.__func__:
                     # unsubscribe it because we want invalidation to be fine-grained
-                    dep.subscribers.remove(load)
-                    load.dependencies.remove(dep)
+                    dep.unsubscribe(load)
 
     @property
     def load(self):
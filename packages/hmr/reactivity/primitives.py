@@ -1,65 +1,163 @@
-from collections.abc import Callable
-from typing import Any, Literal, Self, overload
+import contextvars
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor
+from contextlib import contextmanager, nullcontext
+from heapq import heappop, heappush
+from itertools import count
+from threading import Lock, RLock
+from typing import TYPE_CHECKING, Any, Literal, Self, overload
 from weakref import WeakSet
 
-from .context import Context, default_context
+from .context import Context, Stack, default_context
+from .equality import Equality, equal
 
+if TYPE_CHECKING:
+    from .streams import Overflow
+
+_stripes = tuple(Lock() for _ in range(64))
+
+_worker_refresh_lock = RLock()
+"""Serializes derived refreshes in parallel flush workers, which run without the context lock (the flushing thread holds it for them)."""
+
+_leaf_lookup = False
+"""Set once any context is forked or thread-safe. Until then every context is its own leaf, so the hot paths skip the `ContextVar` lookup."""
 
-def _equal(a, b):
-    if a is b:
-        return True
-    comparison_result: Any = False
-    for i in range(3):  # pandas DataFrame's .all() returns a Series, which is still incompatible :(
-        try:
-            if i == 0:
-                comparison_result = a == b
-            if comparison_result:
-                return True
-        except (ValueError, RuntimeError) as e:
-            if "is ambiguous" in str(e) and hasattr(comparison_result, "all"):  # array-like instances
-                comparison_result = comparison_result.all()
-            else:
-                return False
-    return False
+
+def _enable_leaf_lookup():
+    global _leaf_lookup
+    _leaf_lookup = True
+
+
+@contextmanager
+def _locked(*nodes: object):
+    """Lock the stripes of `nodes` in a fixed order. Used by thread-safe contexts around edge mutations."""
+    locks = sorted({_stripes[hash(node) % len(_stripes)] for node in nodes}, key=_stripes.index)
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
 
 
 class Subscribable:
+    __slots__ = ("__weakref__", "_subscribers", "context")
+
+    height = 0
+    """Topological rank used by `Batch.flush`. Plain sources stay at 0."""
+
     def __init__(self, *, context: Context | None = None):
-        super().__init__()
-        self.subscribers = set[BaseComputation]()
+        if isinstance(self, BaseComputation):
+            super().__init__(context=context)  # type: ignore  # it comes next in the MRO, and needs the context to find its owner
+        else:
+            super().__init__()
+        self._subscribers: set[BaseComputation] | None = None  # allocated on the first edge
         self.context = context or default_context
 
+    @property
+    def subscribers(self) -> "set[BaseComputation]":
+        if self._subscribers is None:
+            self._subscribers = set()
+        return self._subscribers
+
+    @subscribers.setter
+    def subscribers(self, value: "set[BaseComputation]"):
+        self._subscribers = value
+
     def track(self):
-        ctx = self.context.leaf
+        ctx = self.context
+        if _leaf_lookup:
+            ctx = ctx.async_execution_context.get() or ctx  # inlined `ctx.leaf`
 
-        if not ctx.current_computations:
+        if (head := ctx.current_computations.head) is None:
+            return
+        last = head[0]
+        if last is self:
+            return
+        tracked = ctx.tracked_dependencies.head[0]  # type: ignore
+        if self in tracked:  # already read in this run
+            return
+        tracked.add(self)
+        if type(subscribers := self._subscribers) is set and last in subscribers:  # the edge is kept from the last run
+            return
+        with ctx.untrack():
+            self.subscribe(last)
+
+    def subscribe(self, computation: "BaseComputation"):
+        if self.context.lock is not None:
+            with _locked(self, computation):
+                self.subscribers.add(computation)
+                computation.dependencies.add(self)
             return
-        last = ctx.current_computations[-1]
-        if last is not self:
-            with ctx.untrack():
-                self.subscribers.add(last)
-                last.dependencies.add(self)
+        self.subscribers.add(computation)
+        computation.dependencies.add(self)
+
+    def unsubscribe(self, computation: "BaseComputation"):
+        if self.context.lock is not None:
+            with _locked(self, computation):
+                self.subscribers.remove(computation)
+                computation.dependencies.remove(self)
+            return
+        self.subscribers.remove(computation)
+        computation.dependencies.remove(self)
 
     def notify(self):
-        ctx = self.context.leaf
+        if not self._subscribers:
+            return
+
+        ctx = self.context
+        if _leaf_lookup:
+            ctx = ctx.async_execution_context.get() or ctx
 
-        if ctx.batches:
-            ctx.schedule_callbacks(self.subscribers)
+        if ctx.tracers:
+            for tracer in ctx.tracers:
+                tracer.on_notify(self, len(self._subscribers))
+
+        if (lock := ctx.lock) is not None:
+            with lock:  # so that a computation disposed by another thread can't be scheduled after that
+                _schedule(ctx, [*self._subscribers])  # copying is atomic, iterating isn't
+        elif self.context.lock is not None:  # a parallel flush worker, other workers may be adding edges meanwhile
+            _schedule(ctx, [*self._subscribers])
         else:
-            with Batch(force_flush=False, context=ctx):
-                ctx.schedule_callbacks(self.subscribers)
+            _schedule(ctx, self._subscribers)
+
+
+def _schedule(ctx: Context, subscribers: "Iterable[BaseComputation]"):
+    if ctx.batches:
+        ctx.schedule_callbacks(subscribers)
+    else:
+        with Batch(force_flush=False, context=ctx):
+            ctx.schedule_callbacks(subscribers)
 
 
 class BaseComputation[T]:
+    __slots__ = ()  # subclasses declare their own slots, so that `BaseDerived` can mix it with `Subscribable`
+
     def __init__(self, *, context: Context | None = None):
         super().__init__()
-        self.dependencies = WeakSet[Subscribable]()
+        self._dependencies: WeakSet[Subscribable] | None = None  # allocated on the first edge
         self.context = context or default_context
+        self.height = 0
+        if (owner := self.context.leaf.owners.head) is not None:
+            self._owner = owner = owner[0]
+            owner.children[self] = None
+            self._scope = Owner(self.context)
+
+    @property
+    def dependencies(self) -> WeakSet[Subscribable]:
+        if self._dependencies is None:
+            self._dependencies = WeakSet()
+        return self._dependencies
 
     def dispose(self):
-        for dep in self.dependencies:
-            dep.subscribers.remove(self)
-        self.dependencies.clear()
+        with self.context.leaf.lock or nullcontext():
+            for dep in [*self.dependencies]:
+                dep.unsubscribe(self)
+        if (owner := self._owner) is not None:
+            owner.children.pop(self, None)  # so that a long-lived owner doesn't keep what's already gone
+        if (scope := self._scope) is not None:
+            scope.dispose()
 
     def _enter(self):
         return self.context.leaf.enter(self)
@@ -72,6 +170,17 @@ class BaseComputation[T]:
 
     def trigger(self) -> Any: ...
 
+    height = 0
+    """One more than the highest dependency, updated after each run. See `Batch.flush`."""
+
+    parallel = False
+    """Whether a `Batch` with an executor may run this computation in a worker thread."""
+
+    _scope: "Owner | None" = None
+    """Owns the computations created during the last run. Only computations that are owned themselves have one."""
+
+    _owner: "Owner | None" = None
+
     def __call__(self) -> T:
         return self.trigger()
 
@@ -88,11 +197,37 @@ class BaseComputation[T]:
     """
 
 
+class Owner:
+    """An ownership scope, see `Context.root`. Disposing it disposes everything it owns, in reverse creation order."""
+
+    __slots__ = ("children", "context")
+
+    def __init__(self, context: Context | None = None):
+        self.children: dict[BaseComputation, None] = {}
+        """The owned computations in creation order. A dict, so that disposing one of them on its own removes it in O(1)."""
+        self.context = context or default_context
+
+    def __enter__(self):
+        self.context.leaf.owners.append(self)
+        return self
+
+    def __exit__(self, *_):
+        last = self.context.leaf.owners.pop()
+        assert last is self
+
+    def dispose(self):
+        children, self.children = self.children, {}
+        for child in reversed(children):
+            child.dispose()
+
+
 class Signal[T](Subscribable):
-    def __init__(self, initial_value: T = None, check_equality=True, *, context: Context | None = None):
+    __slots__ = ("_equals", "_value")
+
+    def __init__(self, initial_value: T = None, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         super().__init__(context=context)
         self._value: T = initial_value
-        self._check_equality = check_equality
+        self._equals = (equals or equal) if check_equality else None
 
     def get(self, track=True):
         if track:
@@ -100,7 +235,7 @@ class Signal[T](Subscribable):
         return self._value
 
     def set(self, value: T):
-        if not self._check_equality or not _equal(self._value, value):
+        if (equals := self._equals) is None or not equals(self._value, value):
             self._value = value
             self.notify()
             return True
@@ -109,6 +244,12 @@ class Signal[T](Subscribable):
     def update(self, updater: Callable[[T], T]):
         return self.set(updater(self._value))
 
+    def changes(self, maxsize=1, overflow: "Overflow" = "drop_oldest"):
+        """Iterate over the new values asynchronously. See `reactivity.streams.Changes`."""
+        from .streams import Changes
+
+        return Changes(self.get, maxsize, overflow, context=self.context)
+
 
 class DescriptorMixin[T]:
     SLOT_KEY = "_reactive_descriptors_"
@@ -179,10 +320,8 @@ class DescriptorMixin[T]:
 
 
 class State[T](Signal[T], DescriptorMixin[Signal[T]]):
-    def __init__(self, initial_value: T = None, check_equality=True, *, context: Context | None = None):
-        super().__init__(initial_value, check_equality, context=context)
-        self._value = initial_value
-        self._check_equality = check_equality
+    def __init__(self, initial_value: T = None, check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
+        super().__init__(initial_value, check_equality, context=context, equals=equals)
 
     @overload
     def __get__(self, instance: None, owner: type) -> Self: ...
@@ -198,10 +337,14 @@ class State[T](Signal[T], DescriptorMixin[Signal[T]]):
         self.find(instance).set(value)
 
     def _new(self, instance):  # noqa: ARG002
-        return Signal(self._value, self._check_equality, context=self.context)
+        return Signal(self._value, self._equals is not None, context=self.context, equals=self._equals)
 
 
 class Effect[T](BaseComputation[T]):
+    __slots__ = ("__dict__", "__weakref__", "_dependencies", "_fn", "context", "height")
+
+    parallel = True
+
     def __init__(self, fn: Callable[[], T], call_immediately=True, *, context: Context | None = None):
         super().__init__(context=context)
 
@@ -216,71 +359,223 @@ class Effect[T](BaseComputation[T]):
 
 
 class Batch:
-    def __init__(self, force_flush=True, *, context: Context | None = None):
+    def __init__(self, force_flush=True, *, context: Context | None = None, executor: Executor | None = None):
         self.callbacks = set[BaseComputation]()
         self.force_flush = force_flush
         self.context = context or default_context
+        self.executor = executor
+        """
+        Opt-in parallel flushing. Effects of the same height are run concurrently in this executor, after the deriveds of that height.
+        Their exceptions are collected and raised together as an `ExceptionGroup` once the layer is done.
+        Effects running in parallel shouldn't create edges to the same new dependencies unless the context is thread-safe.
+        """
 
     def flush(self):
-        triggered = set()
-        while self.callbacks:
-            callbacks: list[BaseComputation] = []
-            deriveds: list[BaseDerived] = []
+        flush = self._flush if self.executor is None else self._flush_layers
+        if (lock := self.context.leaf.lock) is not None:
+            with lock:
+                return flush()
+        return flush()
+
+    def _flush(self):
+        # Computations are run lowest-height first, so every dependency of a node is settled before the node itself runs.
+        # Each computation is triggered at most once per flush, even if it is notified again afterwards.
+        triggered = set[BaseComputation]()
+        queue: list[tuple[int, int, BaseComputation]] = []
+        order = count()  # tie-breaker, keeps scheduling order among nodes of the same height
+        while True:
             for computation in self.callbacks - triggered:
-                if isinstance(computation, BaseDerived):
-                    computation.dirty = True  # to prevent a dirty Derived from being missed by a subscriber's _sync_dirty_deps before marking
-                    deriveds.append(computation)
-                else:
-                    callbacks.append(computation)
+                triggered.add(computation)
+                heappush(queue, (computation.height, next(order), computation))
             self.callbacks.clear()
-            for d in deriveds:
-                d.trigger()
-                triggered.add(d)
-            # Deriveds are triggered first to ensure intermediate nodes in the dependency graph are updated before callbacks execute.
-            # This prevents stale values when callbacks read from derived computations.
-            # TODO: Extend this ordering to handle `Memoized` and other nodes that inherit from both Subscribable and BaseComputation.
-            for computation in callbacks:
-                if computation in self.callbacks:
-                    continue  # skip if re-added during callback
-                computation.trigger()
+            if not queue:
+                break
+            computation = heappop(queue)[2]
+            if isinstance(computation, BaseDerived) and not computation.dirty:
+                continue  # already pulled by a reader since it was scheduled
+            computation.trigger()
+
+    def _flush_layers(self):
+        assert self.executor is not None
+        triggered = set[BaseComputation]()
+        queue: list[tuple[int, int, BaseComputation]] = []
+        order = count()
+        while True:
+            for computation in self.callbacks - triggered:
                 triggered.add(computation)
+                heappush(queue, (computation.height, next(order), computation))
+            self.callbacks.clear()
+            if not queue:
+                break
+            height = queue[0][0]
+            parallel: list[BaseComputation] = []
+            while queue and queue[0][0] == height:
+                computation = heappop(queue)[2]
+                if isinstance(computation, BaseDerived):
+                    if computation.dirty:
+                        computation.trigger()
+                elif computation.parallel:
+                    parallel.append(computation)
+                else:
+                    computation.trigger()
+
+            errors: list[Exception] = []
+            if len(parallel) == 1:
+                try:
+                    parallel[0].trigger()
+                except Exception as e:
+                    errors.append(e)
+            elif parallel:
+                futures = [self.executor.submit(contextvars.Context().run, self._run_in_worker, computation) for computation in parallel]
+                errors.extend(e for future in futures if isinstance(e := future.exception(), Exception))
+            if errors:
+                raise ExceptionGroup(f"{len(errors)} of {len(parallel)} effects failed", errors)  # noqa: TRY003
+
+    def _run_in_worker(self, computation: BaseComputation):
+        # The flushing thread holds the lock (if any) on behalf of the workers, and their notifications are collected by this batch.
+        var = self.context.async_execution_context
+        _enable_leaf_lookup()
+        var.set(Context(Stack(), [self], Stack(), Stack(), self.context.tracers, var))
+        return computation.trigger()
 
     def __enter__(self):
-        self.context.batches.append(self)
+        self.context.leaf.batches.append(self)
+
+    async def __aenter__(self):
+        # Notifications are held in a context of this task (and the tasks it starts), so other tasks' writes don't join this batch while it awaits.
+        context = self.context
+        leaf = context.leaf
+        _enable_leaf_lookup()
+        self._token = context.async_execution_context.set(
+            Context(leaf.current_computations.copy(), [self], leaf.tracked_dependencies.copy(), leaf.owners.copy(), context.tracers, context.async_execution_context, leaf.lock)
+        )
+        return self
+
+    async def __aexit__(self, *_):
+        try:
+            self.flush()
+        finally:
+            self.context.leaf.batches.pop()  # tasks started inside the block share the list, don't leave them a closed batch
+            self.context.async_execution_context.reset(self._token)
 
     def __exit__(self, *_):
-        if self.force_flush or len(self.context.batches) == 1:
+        context = self.context.leaf
+        if self.force_flush or len(context.batches) == 1:
             try:
                 self.flush()
             finally:
-                last = self.context.batches.pop()
+                last = context.batches.pop()
         else:
-            last = self.context.batches.pop()
-            self.context.schedule_callbacks(self.callbacks)
+            last = context.batches.pop()
+            context.schedule_callbacks(self.callbacks)
         assert last is self
 
 
 class BaseDerived[T](Subscribable, BaseComputation[T]):
+    __slots__ = ()
+
     def __init__(self, *, context: Context | None = None):
         super().__init__(context=context)
         self.dirty = True
-
-    def _sync_dirty_deps(self, *_syncing: BaseComputation) -> Any:
+        self._stale = True
+        """Whether some dependency may have changed since the last sync. See `_sync_dirty_deps`."""
+        self.observers = 0
+        """Number of subscribers that are observed, i.e. not deriveds or deriveds with observers themselves."""
+
+    def subscribe(self, computation: BaseComputation):
+        if self.context.lock is not None:
+            # Workers of a parallel flush create edges without the context lock. Deciding under the stripes keeps the decision consistent
+            # with the edge itself and with `_count_observers` walking the computation's dependencies.
+            with _locked(self, computation):
+                observe = computation not in self.subscribers and _observing(computation)
+                self.subscribers.add(computation)
+                computation.dependencies.add(self)
+            if observe:
+                self._observe()
+            return
+        if computation not in self.subscribers and _observing(computation):
+            self._observe()
+        super().subscribe(computation)
+
+    def unsubscribe(self, computation: BaseComputation):
+        if self.context.lock is not None:
+            with _locked(self, computation):
+                self.subscribers.remove(computation)
+                computation.dependencies.remove(self)
+                unobserve = _observing(computation)
+            if unobserve:
+                self._unobserve()
+            return
+        super().unsubscribe(computation)
+        if _observing(computation):
+            self._unobserve()
+
+    def _observe(self):
+        if self.context.lock is not None:
+            return self._count_observers(1)
+        stack: list[BaseDerived] = [self]
+        while stack:
+            derived = stack.pop()
+            derived.observers += 1
+            if derived.observers == 1:  # just became observed, so it starts observing its own dependencies
+                stack.extend(dep for dep in derived.dependencies if isinstance(dep, BaseDerived))
+
+    def _unobserve(self):
+        if self.context.lock is not None:
+            return self._count_observers(-1)
+        stack: list[BaseDerived] = [self]
+        while stack:
+            derived = stack.pop()
+            derived.observers -= 1
+            if derived.observers == 0:
+                stack.extend(dep for dep in derived.dependencies if isinstance(dep, BaseDerived))
+
+    def _count_observers(self, delta: Literal[1, -1]):
+        # Like `_observe` and `_unobserve`, but each count is updated and each dependency set is read under the stripe of its node.
+        # Only one stripe is held at a time, so this can't deadlock with `subscribe`.
+        boundary = 1 if delta == 1 else 0
+        stack: list[BaseDerived] = [self]
+        while stack:
+            derived = stack.pop()
+            with _locked(derived):
+                derived.observers += delta
+                if derived.observers == boundary:
+                    stack.extend(dep for dep in derived.dependencies if isinstance(dep, BaseDerived))
+
+    def _sync_dirty_deps(self) -> Any:
+        # Nothing upstream has been marked dirty since the last sync, so no dependency can be dirty. This makes reading a clean node O(1).
+        # The flag is cleared before walking, which also stops the walk at cycles and shared (diamond) dependencies.
+        if not self._stale:
+            return
+        self._stale = False
         current_computations = self.context.leaf.current_computations
-        for dep in self.dependencies:
-            if isinstance(dep, BaseDerived) and dep not in current_computations and dep not in _syncing:
-                dep._sync_dirty_deps(*_syncing, self)  # noqa: SLF001
+        for dep in tuple(self.dependencies):  # recomputing a dependency may unsubscribe this node from others
+            if isinstance(dep, BaseDerived) and (dep._stale or dep.dirty) and dep not in current_computations:  # noqa: SLF001
+                dep._sync_dirty_deps()  # noqa: SLF001
                 if dep.dirty:
                     dep()
 
+    def _mark_dirty(self):
+        self.dirty = True
+        self._stale = True
+        # Everything downstream may read a stale value now. Already stale nodes have their downstream marked, so the walk stops there.
+        stack = [*(self._subscribers or ())]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, BaseDerived) and not node._stale:  # noqa: SLF001
+                node._stale = True  # noqa: SLF001
+                stack.extend(node._subscribers or ())  # noqa: SLF001
+
 
 class Derived[T](BaseDerived[T]):
+    __slots__ = ("__dict__", "_dependencies", "_equals", "_stale", "_value", "dirty", "fn", "height", "observers")
+
     UNSET: T = object()  # type: ignore
 
-    def __init__(self, fn: Callable[[], T], check_equality=True, *, context: Context | None = None):
+    def __init__(self, fn: Callable[[], T], check_equality=True, *, context: Context | None = None, equals: Equality | None = None):
         super().__init__(context=context)
         self.fn = fn
-        self._check_equality = check_equality
+        self._equals = (equals or equal) if check_equality else None
         self._value = self.UNSET
 
     def recompute(self):
@@ -289,7 +584,7 @@ class Derived[T](BaseDerived[T]):
                 value = self.fn()
             finally:
                 self.dirty = False
-            if self._check_equality and _equal(value, self._value):
+            if (equals := self._equals) is not None and equals(value, self._value):
                 return
             if self._value is self.UNSET:
                 self._value = value
@@ -300,29 +595,30 @@ class Derived[T](BaseDerived[T]):
 
     def __call__(self):
         self.track()
+        if self._stale or self.dirty:
+            if (lock := self.context.leaf.lock) is None and self.context.lock is not None:
+                lock = _worker_refresh_lock
+            if lock is None:
+                self._refresh()
+            else:
+                with lock:  # so that other threads don't see a half-synced node
+                    self._refresh()
+
+        return self._value
+
+    def _refresh(self):
         self._sync_dirty_deps()
         if self.dirty:
             self.recompute()
 
-        return self._value
-
     def trigger(self):
-        self.dirty = True
-        if _pulled(self):
+        self._mark_dirty()
+        if self.observers:
             self()
 
     def invalidate(self):
         self.trigger()
 
 
-def _pulled(sub: Subscribable):
-    visited = set()
-    to_visit: set[Subscribable] = {sub}
-    while to_visit:
-        visited.add(current := to_visit.pop())
-        for s in current.subscribers:
-            if not isinstance(s, BaseDerived):
-                return True
-            if s not in visited:
-                to_visit.add(s)
-    return False
+def _observing(computation: BaseComputation):
+    return not isinstance(computation, BaseDerived) or computation.observers > 0
@@ -0,0 +1,160 @@
+from collections import deque
+from collections.abc import AsyncIterable, Callable
+from typing import Any, Literal
+
+from .async_primitives import TaskFactory, _event, default_task_factory, sleep
+from .context import Context
+from .equality import Equality
+from .primitives import Effect, Signal
+
+type Overflow = Literal["drop_oldest", "drop_newest", "error"]
+
+
+class Changes[T]:
+    """
+    An async iterator over the new values of `source`, usually created with `Signal.changes()`. The current value is not yielded.
+
+    Values that the consumer hasn't taken yet wait in a buffer of `maxsize` items. With the default of 1, a slow consumer only sees the latest value.
+    When the buffer is full, `overflow` decides whether to drop the oldest value, drop the new one, or raise `OverflowError` from the iterator.
+    """
+
+    __slots__ = ("_buffer", "_closed", "_effect", "_event", "_overflowed", "_started", "maxsize", "overflow", "source")
+
+    def __init__(self, source: Callable[[], T], maxsize=1, overflow: Overflow = "drop_oldest", *, context: Context | None = None):
+        self.source = source
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._buffer = deque[T]()
+        self._event: Any = None
+        self._closed = False
+        self._overflowed = False
+        self._started = False
+        self._effect = Effect(self._watch, context=context)
+
+    def _watch(self):
+        value = self.source()
+        if not self._started:
+            self._started = True
+            return
+        if len(self._buffer) >= self.maxsize:
+            match self.overflow:
+                case "drop_oldest":
+                    self._buffer.popleft()
+                case "drop_newest":
+                    return
+                case "error":
+                    self._overflowed = True
+                    self._wake()
+                    return
+        self._buffer.append(value)
+        self._wake()
+
+    def _wake(self):
+        if self._event is not None:
+            self._event.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> T:
+        while True:
+            if self._overflowed:
+                self._overflowed = False
+                raise OverflowError(f"more than {self.maxsize} values were not consumed in time")  # noqa: TRY003
+            if self._buffer:
+                return self._buffer.popleft()
+            if self._closed:
+                raise StopAsyncIteration
+            self._event = _event()
+            try:
+                await self._event.wait()
+            finally:
+                self._event = None
+
+    def dispose(self):
+        self._closed = True
+        self._effect.dispose()
+        self._wake()
+
+    async def aclose(self):
+        self.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.dispose()
+
+
+class StreamSignal[T, S](Signal[T]):
+    """
+    A signal driven by an async iterable. Each item is folded into the value with `reducer(value, item)`.
+
+    Items arriving in the same loop tick are folded together and notified once. Call `dispose` to stop consuming at the next item.
+    """
+
+    __slots__ = ("_closed", "_next", "_scheduled", "reducer", "start", "stream", "task")
+
+    def __init__(
+        self,
+        stream: AsyncIterable[S],
+        reducer: Callable[[T, S], T],
+        initial_value: T = None,
+        check_equality=True,
+        *,
+        context: Context | None = None,
+        equals: Equality | None = None,
+        task_factory: TaskFactory = default_task_factory,
+    ):
+        super().__init__(initial_value, check_equality, context=context, equals=equals)
+        self.stream = stream
+        self.reducer = reducer
+        self.start = task_factory
+        self._next: T = initial_value
+        self._scheduled = False
+        self._closed = False
+        self.task = task_factory(self._consume)
+        """Completes when the stream is exhausted."""
+
+    async def _consume(self):
+        async for item in self.stream:
+            if self._closed:
+                break
+            self._next = self.reducer(self._next if self._scheduled else self._value, item)
+            if not self._scheduled:
+                self._scheduled = True
+                self.start(self._flush)
+
+    async def _flush(self):
+        await sleep(0)  # let the rest of the burst arrive
+        self._scheduled = False
+        if not self._closed:
+            self.set(self._next)
+
+    def dispose(self):
+        self._closed = True
+
+
+def _latest[T](_: object, item: T) -> T:
+    return item
+
+
+def signal_from_async_iter[T](
+    stream: AsyncIterable[T], initial_value: T = None, check_equality=True, *, context: Context | None = None, equals: Equality | None = None, task_factory: TaskFactory = default_task_factory
+) -> StreamSignal[T, T]:
+    """A signal holding the latest item of `stream`."""
+    return StreamSignal(stream, _latest, initial_value, check_equality, context=context, equals=equals, task_factory=task_factory)
+
+
+def derived_from_stream[T, S](
+    stream: AsyncIterable[S],
+    reducer: Callable[[T, S], T],
+    initial_value: T,
+    check_equality=True,
+    *,
+    context: Context | None = None,
+    equals: Equality | None = None,
+    task_factory: TaskFactory = default_task_factory,
+) -> StreamSignal[T, S]:
+    """A signal accumulating the items of `stream` with `reducer`, like `functools.reduce`."""
+    return StreamSignal(stream, reducer, initial_value, check_equality, context=context, equals=equals, task_factory=task_factory)
@@ -0,0 +1,126 @@
+from collections.abc import Awaitable, Callable
+from math import inf
+from time import monotonic
+
+from .async_primitives import TaskFactory, default_task_factory, sleep
+from .context import Context, default_context
+from .equality import Equality
+from .primitives import BaseComputation, Effect, Signal
+
+
+class ThrottledSignal[T](Signal[T]):
+    """
+    A signal that notifies at most once per `interval` seconds (measured by `timer`).
+
+    Writes always update the value. A write within the interval schedules a single trailing notification with `task_factory`, so subscribers see the latest value.
+    Without an event loop to schedule it on, such a write notifies synchronously instead of being dropped.
+    """
+
+    __slots__ = ("_last_notify", "_pending", "_source", "interval", "start", "timer")
+
+    def __init__(
+        self,
+        initial_value: T = None,
+        interval: float = 0,
+        check_equality=True,
+        *,
+        context: Context | None = None,
+        equals: Equality | None = None,
+        task_factory: TaskFactory = default_task_factory,
+        timer: Callable[[], float] = monotonic,
+    ):
+        super().__init__(initial_value, check_equality, context=context, equals=equals)
+        self.interval = interval
+        self.start = task_factory
+        self.timer = timer
+        self._last_notify = -inf
+        self._pending = False
+        self._source: Effect | None = None
+
+    def notify(self):
+        if self._pending:
+            return  # the scheduled notification will carry this write too
+        now = self.timer()
+        if now - self._last_notify >= self.interval:
+            self._last_notify = now
+            super().notify()
+        else:
+            try:
+                self.start(self._notify_later)
+            except RuntimeError:  # no running event loop
+                self._last_notify = now
+                super().notify()
+            else:
+                self._pending = True
+
+    async def _notify_later(self):
+        await sleep(self._last_notify + self.interval - self.timer())
+        self._pending = False
+        self._last_notify = self.timer()
+        Signal.notify(self)
+
+    def dispose(self):
+        """Stop following the source, if created by `throttled`."""
+        if self._source is not None:
+            self._source.dispose()
+            self._source = None
+
+
+def throttled[T](
+    source: Callable[[], T] | Signal[T], interval: float, *, context: Context | None = None, task_factory: TaskFactory = default_task_factory, timer: Callable[[], float] = monotonic
+) -> ThrottledSignal[T]:
+    """A read-only view of `source` that notifies its subscribers at most once per `interval` seconds."""
+    read = source if callable(source) else source.get
+    with (context or default_context).leaf.untrack():
+        value = read()  # so that the first run of the effect below doesn't notify
+    signal = ThrottledSignal(value, interval, context=context, task_factory=task_factory, timer=timer)
+    signal._source = Effect(lambda: signal.set(read()), context=context)  # noqa: SLF001
+    return signal
+
+
+class DebouncedEffect[T](BaseComputation[Awaitable[T | None]]):
+    """
+    An effect that reruns only after `wait` seconds (measured by `timer`) have passed without it being triggered again. The first run is immediate.
+
+    Triggering returns the pending rerun, which resolves to `None` if the effect is disposed before it fires.
+    """
+
+    __slots__ = ("__dict__", "__weakref__", "_deadline", "_dependencies", "_fn", "_task", "context", "height", "start", "timer", "wait")
+
+    def __init__(
+        self, fn: Callable[[], T], wait: float, call_immediately=True, *, context: Context | None = None, task_factory: TaskFactory = default_task_factory, timer: Callable[[], float] = monotonic
+    ):
+        super().__init__(context=context)
+        self._fn = fn
+        self.wait = wait
+        self.start = task_factory
+        self.timer = timer
+        self._deadline: float | None = None
+        self._task: Awaitable[T | None] | None = None
+        if call_immediately:
+            self._run()
+
+    def _run(self):
+        with self._enter():
+            return self._fn()
+
+    def trigger(self):
+        self._deadline = self.timer() + self.wait
+        if self._task is None:
+            self._task = self.start(self._run_later)
+        return self._task
+
+    async def _run_later(self):
+        try:
+            while (deadline := self._deadline) is not None and (delay := deadline - self.timer()) > 0:
+                await sleep(delay)
+        finally:
+            self._task = None  # triggers from now on, including ones made by the run below, schedule a new rerun
+        if self._deadline is None:
+            return None  # disposed in the meantime
+        self._deadline = None
+        return self._run()
+
+    def dispose(self):
+        self._deadline = None
+        super().dispose()
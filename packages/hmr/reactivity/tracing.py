@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TextIO
+
+if TYPE_CHECKING:
+    from .primitives import BaseComputation, Subscribable
+
+
+class Tracer:
+    """
+    Receives events from a `Context` it is added to with `Context.add_tracer`. Override the methods you are interested in.
+
+    Timestamps are from `time.perf_counter_ns()`. A context without tracers doesn't produce any event.
+    """
+
+    def on_start(self, computation: BaseComputation, timestamp: int):
+        """A computation starts running."""
+
+    def on_end(self, computation: BaseComputation, timestamp: int, dependencies: int):
+        """A computation finishes running (even by raising), with the number of dependencies it read."""
+
+    def on_notify(self, subscribable: Subscribable, subscribers: int):
+        """A node notifies its subscribers. Nodes without subscribers don't report."""
+
+
+def label(node: object) -> str:
+    """A human-readable name for a node, usually the `__qualname__` of its function."""
+    fn = getattr(node, "function", None) or getattr(node, "fn", None) or getattr(node, "_fn", None)
+    name = getattr(fn, "__qualname__", None) or type(node).__qualname__
+    return f"{type(node).__name__}({name})" if fn is not None else name
+
+
+class Stats:
+    __slots__ = ("dependencies", "fan_out", "max_ns", "notifies", "runs", "total_ns")
+
+    def __init__(self):
+        self.runs = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.dependencies = 0
+        """Number of dependencies read in the last run."""
+        self.notifies = 0
+        self.fan_out = 0
+        """Total number of subscribers notified."""
+
+
+class Profiler(Tracer):
+    """
+    Aggregates tracer events per node. Use `print_stats` to show the hottest computations.
+
+    Times are inclusive, i.e. they contain the time spent in nested computations. Nodes are kept alive until `clear` is called.
+    """
+
+    def __init__(self):
+        self.stats: dict[object, Stats] = {}
+        self._started: dict[BaseComputation, list[int]] = {}
+
+    def _get(self, node: object):
+        if (stats := self.stats.get(node)) is None:
+            stats = self.stats[node] = Stats()
+        return stats
+
+    def on_start(self, computation, timestamp):
+        self._started.setdefault(computation, []).append(timestamp)
+
+    def on_end(self, computation, timestamp, dependencies):
+        if not (started := self._started.get(computation)):
+            return  # added while the computation was running
+        elapsed = timestamp - started.pop()
+        if not started:
+            del self._started[computation]
+        stats = self._get(computation)
+        stats.runs += 1
+        stats.total_ns += elapsed
+        stats.max_ns = max(stats.max_ns, elapsed)
+        stats.dependencies = dependencies
+
+    def on_notify(self, subscribable, subscribers):
+        stats = self._get(subscribable)
+        stats.notifies += 1
+        stats.fan_out += subscribers
+
+    def clear(self):
+        self.stats.clear()
+        self._started.clear()
+
+    def top(self, n=10, *, sort: str = "total_ns"):
+        return sorted(self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True)[:n]
+
+    def print_stats(self, n=10, *, sort: str = "total_ns", file: TextIO | None = None):
+        rows = [
+            (label(node), str(s.runs), f"{s.total_ns / 1e6:.3f}", f"{s.total_ns / s.runs / 1e3 if s.runs else 0:.1f}", f"{s.max_ns / 1e3:.1f}", str(s.dependencies), str(s.notifies), str(s.fan_out))
+            for node, s in self.top(n, sort=sort)
+        ]
+        header = ("node", "runs", "total ms", "mean us", "max us", "deps", "notifies", "fan-out")
+        widths = [max(len(row[i]) for row in (header, *rows)) for i in range(len(header))]
+        for row in (header, *rows):
+            print("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths, strict=True))).rstrip(), file=file)
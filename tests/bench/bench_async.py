@@ -0,0 +1,93 @@
+"""
+Throughput of starting async reactive tasks, with `default_task_factory` picking the async library on every call and with a long-lived `task_group()`.
+
+Each run triggers an `AsyncEffect` and calls an `AsyncDerived` many times, then waits for all of them.
+`test_concurrent_recomputes` invalidates thousands of `AsyncDerived` at once and recomputes them concurrently, each in its own forked context.
+"""
+
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
+from time import perf_counter
+
+from pytest import mark
+from reactivity.async_primitives import AsyncDerived, AsyncEffect, task_group
+from reactivity.primitives import Signal
+
+TRIGGERS = 5000
+DERIVEDS = 3000
+
+
+async def run(grouped: bool, gather: Callable[[list[Awaitable]], Awaitable]):
+    s = Signal(0)
+
+    async def noop():
+        return s.get()
+
+    async with task_group() if grouped else nullcontext():
+        effect = AsyncEffect(noop, False)
+        derived = AsyncDerived(noop)
+        await derived()
+
+        start = perf_counter()
+        tasks = [effect.trigger() for _ in range(TRIGGERS)]
+        tasks += [derived() for _ in range(TRIGGERS)]
+        await gather(tasks)
+        return perf_counter() - start
+
+
+async def recompute_all(gather: Callable[[list[Awaitable]], Awaitable]):
+    s = Signal(0)
+
+    async def read():
+        return s.get()
+
+    deriveds = [AsyncDerived(read) for _ in range(DERIVEDS)]
+    await gather([derived() for derived in deriveds])
+
+    elapsed = float("inf")
+    for i in range(1, 4):
+        start = perf_counter()
+        s.set(i)
+        await gather([derived() for derived in deriveds])
+        elapsed = min(elapsed, perf_counter() - start)
+    return elapsed
+
+
+async def asyncio_gather(tasks: list[Awaitable]):
+    from asyncio import gather
+
+    await gather(*tasks)
+
+
+async def trio_gather(tasks: list[Awaitable]):
+    for task in tasks:
+        await task
+
+
+@mark.parametrize("grouped", [False, True], ids=["default", "task_group"])
+@mark.parametrize("library", ["asyncio", "trio"])
+def test_trigger_throughput(library: str, grouped: bool, record_property):
+    if library == "trio":
+        from trio import run as run_trio
+
+        elapsed = min(run_trio(run, grouped, trio_gather) for _ in range(3))
+    else:
+        from asyncio import run as run_asyncio
+
+        elapsed = min(run_asyncio(run(grouped, asyncio_gather)) for _ in range(3))
+
+    record_property("tasks/s", round(TRIGGERS * 2 / elapsed))
+
+
+@mark.parametrize("library", ["asyncio", "trio"])
+def test_concurrent_recomputes(library: str, record_property):
+    if library == "trio":
+        from trio import run as run_trio
+
+        elapsed = run_trio(recompute_all, trio_gather)
+    else:
+        from asyncio import run as run_asyncio
+
+        elapsed = run_asyncio(recompute_all(asyncio_gather))
+
+    record_property("recomputes/s", round(DERIVEDS / elapsed))
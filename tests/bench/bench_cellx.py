@@ -0,0 +1,47 @@
+"""
+The cellx benchmark: layers of four cells, each computed from the layer above, with an effect on every cell.
+
+Expected values are taken from js-reactivity-benchmark.
+"""
+
+from time import perf_counter
+
+from pytest import mark
+from reactivity.helpers import Memoized
+from reactivity.primitives import Batch, Derived, Effect, Signal
+
+EXPECTED = {
+    1000: ([-3, -6, -2, 2], [-2, -4, 2, 3]),
+    2500: ([-3, -6, -2, 2], [-2, -4, 2, 3]),
+    5000: ([2, 4, -1, -6], [-2, 1, -4, -4]),
+}
+
+
+@mark.parametrize("computed", [Derived, Memoized], ids=["derived", "memoized"])
+@mark.parametrize("layers", [*EXPECTED])
+def test_cellx(layers: int, computed: type[Derived] | type[Memoized], record_property):
+    start = perf_counter()
+
+    sources = [Signal(1), Signal(2), Signal(3), Signal(4)]
+    layer = [s.get for s in sources]
+    effects = []
+    for _ in range(layers):
+        a, b, c, d = layer
+        layer = [computed(b), computed(lambda a=a, c=c: a() - c()), computed(lambda b=b, d=d: b() + d()), computed(c)]
+        effects.extend(Effect(cell) for cell in layer)
+
+    built = perf_counter()
+    assert [cell() for cell in layer] == EXPECTED[layers][0]
+
+    with Batch():
+        for signal, value in zip(sources, (4, 3, 2, 1), strict=True):
+            signal.set(value)
+
+    updated = perf_counter()
+    assert [cell() for cell in layer] == EXPECTED[layers][1]
+
+    record_property("build_ms", round((built - start) * 1000, 3))
+    record_property("update_ms", round((updated - built) * 1000, 3))
+
+    for effect in effects:
+        effect.dispose()
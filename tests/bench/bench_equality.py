@@ -0,0 +1,35 @@
+"""
+Cost of setting a signal to an equal value.
+
+Arrays are compared by shape, dtype and bytes instead of elementwise, via the `reactivity.equality` registry.
+"""
+
+from time import perf_counter
+
+from pytest import mark
+from reactivity.primitives import Signal
+
+
+def array():
+    import numpy as np
+
+    return np.arange(1_000_000, dtype=np.float64)
+
+
+def dataframe():
+    import pandas as pd
+
+    return pd.DataFrame({"a": range(100_000), "b": range(100_000)})
+
+
+@mark.parametrize("make", [lambda: 0, lambda: [*range(1000)], array, dataframe], ids=["int", "list-1000", "ndarray-1M", "dataframe-100k"])
+def test_set_equal_value(make, record_property):
+    signal = Signal(make())
+    values = [make() for _ in range(10)]
+
+    start = perf_counter()
+    for value in values:
+        signal.set(value)
+    elapsed = perf_counter() - start
+
+    record_property("us_per_set", round(elapsed / len(values) * 1e6, 3))
@@ -0,0 +1,40 @@
+"""
+Cost of a signal write in front of a wide, mostly unobserved tree of deriveds.
+
+Deciding whether a dirty derived should be recomputed eagerly used to walk every downstream subscriber,
+so each write was O(graph). With incremental observer counts it is O(1) per notified node.
+"""
+
+from contextlib import nullcontext
+from time import perf_counter
+
+from pytest import mark
+from reactivity.primitives import Derived, Effect, Signal
+
+
+def build_tree(source: Signal[int], branching: int, depth: int):
+    nodes = layer = [Derived(source.get)]
+    for _ in range(depth):
+        layer = [Derived(parent) for parent in layer for _ in range(branching)]
+        nodes += layer
+    for node in nodes:
+        node()
+    return nodes
+
+
+@mark.parametrize("observed", [False, True], ids=["unobserved", "observed-leaf"])
+def test_fan_out_write(observed: bool, record_property):
+    s = Signal(0)
+    nodes = build_tree(s, branching=10, depth=4)
+    assert len(nodes) == 11111
+
+    with Effect(nodes[-1]) if observed else nullcontext():
+        start = perf_counter()
+        for i in range(1, 101):
+            s.set(i)
+        elapsed = perf_counter() - start
+
+    record_property("nodes", len(nodes))
+    record_property("us_per_write", round(elapsed / 100 * 1e6, 2))
+
+    assert nodes[-1]() == 100
@@ -0,0 +1,211 @@
+"""
+The "kairo" scenarios from js-reactivity-benchmark, run against both `Derived` and `Memoized`.
+
+Each scenario builds its graph, then returns a function that performs the writes and checks the results.
+Only the latter is timed. Effect runs are asserted where both kinds of computations must agree.
+"""
+
+from collections.abc import Callable
+from time import perf_counter
+from typing import Protocol
+
+from pytest import mark
+from reactivity.helpers import Memoized
+from reactivity.primitives import Derived, Effect, Signal
+
+
+class Computed(Protocol):
+    """`Derived` or `Memoized`, which both wrap a function into a cached reader."""
+
+    def __call__[T](self, fn: Callable[[], T], /) -> Callable[[], T]: ...
+
+
+def busy():
+    a = 0
+    for i in range(100):
+        a += i
+    return a
+
+
+def counted(fn: Callable[[], object], runs: list[int] | None = None):
+    runs = [0] if runs is None else runs
+
+    def effect():
+        fn()
+        runs[0] += 1
+
+    Effect(effect)
+    return runs
+
+
+def avoidable_propagation(computed: Computed):
+    head = Signal(0)
+    computed1 = computed(head.get)
+    computed2 = computed(lambda: (computed1(), 0)[1])
+    computed3 = computed(lambda: (busy(), computed2() + 1)[1])
+    computed4 = computed(lambda: computed3() + 2)
+    computed5 = computed(lambda: computed4() + 3)
+    Effect(lambda: (computed5(), busy()))
+
+    def run():
+        head.set(1)
+        assert computed5() == 6
+        for i in range(1000):
+            head.set(i)
+            assert computed5() == 6
+
+    return run
+
+
+def broad_propagation(computed: Computed):
+    head = Signal(0)
+    last = head.get
+    runs = [0]
+    for i in range(50):
+        current = computed(lambda i=i: head.get() + i)
+        current2 = computed(lambda current=current: current() + 1)
+        counted(current2, runs)
+        last = current2
+
+    def run():
+        head.set(1)
+        runs[0] = 0
+        for i in range(50):
+            head.set(i)
+            assert last() == i + 50
+        assert runs[0] == 50 * 50
+
+    return run
+
+
+def deep_propagation(computed: Computed):
+    length = 50
+    head = Signal(0)
+    current = head.get
+    for _ in range(length):
+        current = computed(lambda c=current: c() + 1)
+    runs = counted(current)
+
+    def run():
+        head.set(1)
+        runs[0] = 0
+        for i in range(50):
+            head.set(i)
+            assert current() == length + i
+        assert runs[0] == 50
+
+    return run
+
+
+def diamond(computed: Computed):
+    width = 5
+    head = Signal(0)
+    branches = [computed(lambda: head.get() + 1) for _ in range(width)]
+    total = computed(lambda: sum(b() for b in branches))
+    runs = counted(total)
+
+    def run():
+        head.set(1)
+        assert total() == 2 * width
+        runs[0] = 0
+        for i in range(500):
+            head.set(i)
+            assert total() == (i + 1) * width
+        assert runs[0] == 500
+
+    return run
+
+
+def mux(computed: Computed):
+    heads = [Signal(0) for _ in range(100)]
+    muxed = computed(lambda: {i: h.get() for i, h in enumerate(heads)})
+    split = [computed(lambda i=i: muxed()[i]) for i in range(len(heads))]
+    split = [computed(lambda x=x: x() + 1) for x in split]
+    for x in split:
+        Effect(x)
+
+    def run():
+        for i in range(10):
+            heads[i].set(i)
+            assert split[i]() == i + 1
+        for i in range(10):
+            heads[i].set(i * 2)
+            assert split[i]() == i * 2 + 1
+
+    return run
+
+
+def repeated_observers(computed: Computed):
+    size = 30
+    head = Signal(0)
+    current = computed(lambda: sum(head.get() for _ in range(size)))
+    runs = counted(current)
+
+    def run():
+        head.set(1)
+        assert current() == size
+        runs[0] = 0
+        for i in range(100):
+            head.set(i)
+            assert current() == i * size
+        assert runs[0] == 100
+
+    return run
+
+
+def triangle(computed: Computed):
+    width = 10
+    head = Signal(0)
+    current = head.get
+    nodes = []
+    for _ in range(width):
+        nodes.append(current)
+        current = computed(lambda c=current: c() + 1)
+    total = computed(lambda: sum(n() for n in nodes))
+    runs = counted(total)
+
+    def run():
+        constant = sum(range(width))
+        head.set(1)
+        assert total() == constant + width
+        runs[0] = 0
+        for i in range(100):
+            head.set(i)
+            assert total() == constant + i * width
+        assert runs[0] == 100
+
+    return run
+
+
+def unstable(computed: Computed):
+    head = Signal(0)
+    double = computed(lambda: head.get() * 2)
+    inverse = computed(lambda: -head.get())
+    current = computed(lambda: sum(double() if head.get() % 2 else inverse() for _ in range(20)))
+    runs = counted(current)
+
+    def run():
+        head.set(1)
+        assert current() == 40
+        runs[0] = 0
+        for i in range(100):
+            head.set(i)
+            assert current() == (i * 2 if i % 2 else -i) * 20
+        assert runs[0] == 100
+
+    return run
+
+
+SCENARIOS = [avoidable_propagation, broad_propagation, deep_propagation, diamond, mux, repeated_observers, triangle, unstable]
+
+
+@mark.parametrize("computed", [Derived, Memoized], ids=["derived", "memoized"])
+@mark.parametrize("scenario", SCENARIOS, ids=[s.__name__ for s in SCENARIOS])
+def test_kairo(scenario: Callable[[Computed], Callable[[], object]], computed: Computed, record_property):
+    run = scenario(computed)
+    best = float("inf")
+    for _ in range(5):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    record_property("ms", round(best * 1000, 3))
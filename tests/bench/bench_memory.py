@@ -0,0 +1,44 @@
+"""
+Memory footprint of graph nodes and edges.
+
+Nodes are slotted and only allocate their edge containers once they are subscribed to or depend on something.
+"""
+
+import tracemalloc
+from gc import collect
+
+from pytest import mark
+from reactivity.collections import ReactiveMapping
+from reactivity.primitives import Derived, Effect, Signal
+
+N = 100_000
+
+
+def measure(create):
+    collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        obj = create()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return obj, after - before
+
+
+@mark.parametrize("kind", [Signal, Derived])
+def test_bytes_per_node(kind, record_property):
+    nodes, size = measure(lambda: [kind(None) for _ in range(N)])
+    record_property("bytes_per_node", round(size / len(nodes), 1))
+
+
+def test_bytes_per_edge(record_property):
+    signals = [Signal(i) for i in range(N)]
+    effect, size = measure(lambda: Effect(lambda: sum(s.get() for s in signals)))
+    with effect:
+        record_property("bytes_per_edge", round(size / N, 1))
+
+
+def test_bytes_per_mapping_key(record_property):
+    mapping, size = measure(lambda: ReactiveMapping(dict.fromkeys(range(N))))
+    record_property("bytes_per_key", round(size / len(mapping), 1))
@@ -0,0 +1,50 @@
+"""
+Cost of reading a `Derived` whose upstream graph hasn't changed.
+
+Writes mark everything downstream as stale, so a clean read returns without walking its dependencies,
+and after a write each node is checked at most once.
+"""
+
+from time import perf_counter
+
+from pytest import mark
+from reactivity.primitives import Derived, Signal
+
+
+def deep_chain():
+    s = Signal(0)
+    chain = [Derived(s.get)]
+    for _ in range(99):
+        chain.append(Derived(chain[-1]))
+    return chain[-1]
+
+
+def wide_sum():
+    deps = [Derived(Signal(i).get) for i in range(1000)]
+    return Derived(lambda: sum(d() for d in deps))
+
+
+@mark.parametrize("make", [deep_chain, wide_sum], ids=["chain-100", "wide-1000"])
+def test_clean_read(make, record_property):
+    derived = make()
+    derived()
+
+    start = perf_counter()
+    for _ in range(1000):
+        derived()
+    elapsed = perf_counter() - start
+
+    record_property("us_per_read", round(elapsed / 1000 * 1e6, 3))
+
+
+def test_read_after_unrelated_write(record_property):
+    derived = deep_chain()
+    unrelated = Signal(0)
+
+    start = perf_counter()
+    for i in range(100):
+        unrelated.set(i)
+        derived()
+    elapsed = perf_counter() - start
+
+    record_property("us_per_read", round(elapsed / 100 * 1e6, 3))
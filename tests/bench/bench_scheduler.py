@@ -0,0 +1,101 @@
+"""
+Recomputation counts of the `Batch.flush` scheduler.
+
+Every dirty node should be evaluated at most once per flush, no matter how many paths lead to it.
+Counts are attached to the report with `record_property`, so `pytest tests/bench --junitxml=...` keeps them around.
+"""
+
+from collections import Counter
+from collections.abc import Callable
+
+from pytest import mark
+from reactivity import batch
+from reactivity.helpers import Memoized
+from reactivity.primitives import Derived, Effect, Signal
+
+
+@mark.parametrize("layers", [1, 10, 100])
+def test_deep_diamond(layers: int, record_property):
+    runs = Counter[str]()
+
+    s = Signal(0)
+    top: Callable[[], int] = s.get
+
+    for i in range(layers):
+
+        def left(i=i, top: Callable[[], int] = top):
+            runs[f"left{i}"] += 1
+            return top() + 1
+
+        def right(i=i, top: Callable[[], int] = top):
+            runs[f"right{i}"] += 1
+            return top() * 2
+
+        a, b = Derived(left), Derived(right)
+
+        def bottom(i=i, a=a, b=b):
+            runs[f"bottom{i}"] += 1
+            return a() + b()
+
+        top = Derived(bottom)
+
+    with Effect(lambda: runs.update(["effect"]) or top()):
+        runs.clear()
+        s.set(1)
+
+    record_property("recomputations", runs.total())
+    assert runs.total() == 3 * layers + 1
+    assert set(runs.values()) == {1}
+
+
+@mark.parametrize("width", [10, 100, 1000])
+def test_fan_in(width: int, record_property):
+    runs = Counter[str]()
+
+    sources = [Signal(i) for i in range(width)]
+    mids = [Derived(s.get) for s in sources]
+
+    @Derived
+    def total():
+        runs["total"] += 1
+        return sum(m() for m in mids)
+
+    @Memoized
+    def doubled():
+        runs["doubled"] += 1
+        return total() * 2
+
+    with Effect(lambda: runs.update(["effect"]) or doubled()):
+        runs.clear()
+
+        with batch():
+            for s in sources:
+                s.update(lambda x: x + 1)
+
+        record_property("recomputations", runs.total())
+        assert runs == {"total": 1, "doubled": 1, "effect": 1}
+
+        runs.clear()
+        sources[0].set(-1)
+        assert runs == {"total": 1, "doubled": 1, "effect": 1}
+
+
+def test_glitch_free_chain(record_property):
+    s = Signal(0)
+    chain = [Derived(s.get)]
+    for _ in range(49):
+        chain.append(Derived(chain[-1]))
+
+    seen = []
+
+    @Derived
+    def tail():
+        seen.append(values := (s.get(), *(d() for d in chain)))
+        return values
+
+    with Effect(tail):
+        seen.clear()
+        s.set(1)
+
+    record_property("recomputations", len(seen))
+    assert seen == [(1,) * 51]
@@ -0,0 +1,77 @@
+"""
+Overhead of reading a signal compared with a plain attribute access.
+
+Reading an edge that already exists (from an earlier read or an earlier run) takes neither list copies nor `Context.untrack()`.
+"""
+
+from time import perf_counter
+
+from pytest import mark
+from reactivity.primitives import Effect, Signal
+
+N = 10_000
+
+
+class Plain:
+    def __init__(self):
+        self.value = 0
+
+    def get(self):
+        return self.value
+
+
+def best_of(fn, repeat=20):
+    return min(timed(fn) for _ in range(repeat))
+
+
+def timed(fn):
+    start = perf_counter()
+    fn()
+    return perf_counter() - start
+
+
+def attribute():
+    obj = Plain()
+    return lambda: [obj.value for _ in range(N)]
+
+
+def method():
+    get = Plain().get
+    return lambda: [get() for _ in range(N)]
+
+
+def untracked():
+    get = Signal(0).get
+    return lambda: [get() for _ in range(N)]
+
+
+@mark.parametrize("make", [attribute, method, untracked])
+def test_read_outside_effects(make, record_property):
+    record_property("ns_per_read", round(best_of(make()) / N * 1e9, 1))
+
+
+def test_repeated_read_in_effect(record_property):
+    get = Signal(0).get
+    results = []
+
+    with Effect(lambda: results.append(best_of(lambda: [get() for _ in range(N)]))):
+        pass
+
+    record_property("ns_per_read", round(results[0] / N * 1e9, 1))
+
+
+def test_first_read_in_rerun(record_property):
+    signals = [Signal(i) for i in range(N)]
+    trigger = Signal(0)
+    results = []
+
+    def run():
+        trigger.get()
+        results.append(timed(lambda: [s.get() for s in signals]))
+
+    with Effect(run):
+        for i in range(20):
+            trigger.set(i + 1)
+
+    record_property("ns_per_read_new_edge", round(results[0] / N * 1e9, 1))
+    record_property("ns_per_read_kept_edge", round(min(results[1:]) / N * 1e9, 1))
@@ -0,0 +1,26 @@
+"""
+Benchmarks report their metrics with `record_property`.
+
+Benchmarks are opt-in: a plain `pytest` skips this directory. Run `pytest tests/bench` (or `pytest --bench` for everything),
+and add `--bench-json=results.json` to also collect the metrics into a JSON file, so that results can be compared across releases.
+Both options are registered in `tests/conftest.py`, which pytest loads before parsing the command line.
+"""
+
+import json
+import platform
+import sys
+from pathlib import Path
+
+results: dict[str, dict] = {}
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call" and report.user_properties:
+        results[report.nodeid] = {"outcome": report.outcome, "duration": report.duration, "metrics": dict(report.user_properties)}
+
+
+def pytest_sessionfinish(session):
+    if path := session.config.getoption("bench_json", None):
+        from reactivity.hmr.core import __version__
+
+        Path(path).write_text(json.dumps({"version": __version__, "python": sys.version, "platform": platform.platform(), "benchmarks": results}, indent=2))
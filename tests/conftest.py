@@ -0,0 +1,14 @@
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent / "bench"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench", action="store_true", help="also run the benchmarks in tests/bench, which a plain pytest run skips")
+    parser.addoption("--bench-json", metavar="PATH", help="write the metrics recorded by benchmarks in tests/bench to a JSON file (implies --bench)")
+
+
+def pytest_ignore_collect(collection_path: Path, config):
+    if collection_path == BENCH_DIR and not (config.getoption("bench") or config.getoption("bench_json")):
+        return True
+    return None
@@ -1,18 +1,25 @@
-from asyncio import TaskGroup, gather, sleep, timeout
+from asyncio import Event as AsyncEvent
+from asyncio import Queue, TaskGroup, gather, get_running_loop, sleep, timeout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import wraps
+from operator import add
+from threading import Event
 
 from pytest import mark, raises
-from reactivity import async_derived
-from reactivity.async_primitives import AsyncDerived, AsyncEffect
-from reactivity.primitives import Derived, Signal
+from reactivity import async_derived, batch, debounced_effect, derived_from_stream, process_derived, signal_from_async_iter, throttled
+from reactivity.async_primitives import AsyncDerived, AsyncEffect, ConcurrencyLimiter, task_group
+from reactivity.primitives import Derived, Effect, Signal
+from reactivity.timing import ThrottledSignal
 from utils import Clock, capture_stdout, create_trio_task_factory, run_trio_in_asyncio
 
 
-def trio(func):
+def trio(func, *, autojump=False):
     @wraps(func)
     async def wrapper():
+        from trio.testing import MockClock
+
         try:
-            return await run_trio_in_asyncio(func)
+            return await run_trio_in_asyncio(func, MockClock(autojump_threshold=0) if autojump else None)
         except ExceptionGroup as e:
             if len(e.exceptions) == 1:
                 raise e.exceptions[0] from None
@@ -20,6 +27,11 @@ def trio(func):
     return wrapper
 
 
+def autojump(func):
+    """Like `trio`, but with a `MockClock` that jumps to the next deadline whenever all tasks are blocked, so sleeps take no real time."""
+    return trio(func, autojump=True)
+
+
 async def test_async_effect():
     s = Signal(1)
 
@@ -274,6 +286,652 @@ async def test_async_derived_track_behavior():
     assert await h() == 2
 
 
+async def test_process_derived():
+    a, b = Signal(1), Signal(2)
+
+    with ProcessPoolExecutor(1) as executor:
+        total = process_derived(add, a.get, b.get, executor=executor)
+
+        @AsyncDerived
+        async def doubled():
+            return await total() * 2
+
+        assert await doubled() == 6
+        assert {*total.dependencies} == {a, b}
+
+        a.set(2)
+        assert await doubled() == 8
+
+
+@trio
+async def test_trio_process_derived():
+    from trio import open_nursery
+
+    s = Signal(1)
+
+    async with open_nursery() as nursery:
+        with ThreadPoolExecutor(1) as executor:
+            d = process_derived(add, s.get, s.get, executor=executor, task_factory=create_trio_task_factory(nursery))
+            assert await d() == 2
+            s.set(2)
+            assert await d() == 4
+
+
+async def test_process_derived_discards_stale_jobs():
+    s = Signal(0)
+    release = {0: Event(), 1: Event(), 2: Event()}
+    runs = []
+
+    def slow(x):
+        runs.append(x)
+        release[x].wait(5)
+        return x
+
+    submitted = []
+
+    class Executor(ThreadPoolExecutor):
+        def submit(self, fn, /, *args, **kwargs):
+            submitted.extend(args)
+            return super().submit(fn, *args, **kwargs)
+
+    with Executor(1) as executor:
+        d = process_derived(slow, s.get, executor=executor)
+        values = []
+
+        async def effect():
+            values.append(await d())
+
+        async with TaskGroup() as tg, timeout(5):
+            with AsyncEffect(effect, task_factory=lambda f: tg.create_task(f())):
+                while not runs:
+                    await sleep(0)
+                s.set(1)
+                s.set(2)
+                while 2 not in submitted:
+                    await sleep(0)
+                release[2].set()
+                release[0].set()  # finishes after the newer job was submitted
+                while 2 not in values:
+                    await sleep(0)
+
+    assert runs == [0, 2]  # the job for 1 was cancelled before it started
+    assert values == [2]
+
+
+async def test_async_effect_switch_to_latest():
+    s = Signal(0)
+    gate = AsyncEvent()
+    started, finished = [], []
+
+    async def query():
+        value = s.get()
+        started.append(value)
+        await gate.wait()
+        finished.append(value)
+        return value
+
+    async with TaskGroup() as tg, timeout(5):
+        with AsyncEffect(query, False, task_factory=lambda f: tg.create_task(f()), policy="latest") as effect:
+            first = effect()
+            await sleep(0)
+            second = effect()
+            s.set(1)
+            s.set(2)
+            gate.set()
+            assert await first == await second == 2  # superseded runs resolve to the latest result
+            assert started == [0, 2]  # the second run was cancelled before it started
+            assert finished == [2]
+
+
+async def test_async_derived_switch_to_latest():
+    s = Signal(0)
+    gate = AsyncEvent()
+    started, finished = [], []
+
+    @async_derived(policy="latest")
+    async def d():
+        value = s.get()
+        started.append(value)
+        await gate.wait()
+        finished.append(value)
+        return value
+
+    async with timeout(5):
+        task = d()
+        while not started:
+            await sleep(0)
+        s.set(1)
+        gate.set()
+        assert await task == 1  # callers of the cancelled run get the newer value
+        assert await d() == 1
+        assert finished == [1]
+
+        seen = []
+        gate.clear()
+
+        async def effect():
+            seen.append(await d())
+
+        async with TaskGroup() as tg:
+            with AsyncEffect(effect, task_factory=lambda f: tg.create_task(f())):
+                while not seen:
+                    await sleep(0)
+                for i in range(2, 5):
+                    s.set(i)
+                    while started[-1] != i:
+                        await sleep(0)
+                gate.set()
+                while finished[-1] != 4:
+                    await sleep(0)
+                await sleep(0)
+
+        assert started == [0, 1, 2, 3, 4]
+        assert finished == [1, 4]
+        assert seen[0] == 1
+        assert seen[-1] == 4
+
+
+async def test_coalesce():
+    s = Signal(0)
+    gate = AsyncEvent()
+    started = []
+
+    async def query():
+        started.append(s.get())
+        await gate.wait()
+        return s.get()
+
+    async with TaskGroup() as tg, timeout(5):
+        with AsyncEffect(query, task_factory=lambda f: tg.create_task(f()), policy="coalesce") as effect:
+            await sleep(0)
+            for i in range(1, 6):
+                s.set(i)
+            gate.set()
+            assert await effect() == 5
+            assert started == [0, 5]  # at most one pending rerun
+
+        gate.clear()
+        d = AsyncDerived(query, policy="coalesce")
+        task = d()
+        while len(started) < 3:
+            await sleep(0)
+        for i in range(6, 9):
+            s.set(i)
+        gate.set()
+        assert await task == await d() == 8
+        assert started == [0, 5, 5, 8]
+
+
+@autojump
+async def test_trio_switch_to_latest():
+    from trio import open_nursery
+    from trio import sleep as trio_sleep
+
+    s = Signal(0)
+    finished = []
+
+    async def query():
+        value = s.get()
+        await trio_sleep(0.02)
+        finished.append(value)
+        return value
+
+    async with open_nursery() as nursery:
+        with AsyncEffect(query, task_factory=create_trio_task_factory(nursery), policy="latest") as effect:
+            await trio_sleep(0)
+            s.set(1)
+            await trio_sleep(0)
+            s.set(2)
+            assert await effect() == 2
+    assert finished == [2]
+
+
+async def test_concurrency_limiter():
+    limiter = ConcurrencyLimiter(3)
+    s = Signal(0)
+    running = [0]
+    peak = [0]
+
+    async def query(i: int):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await sleep(0)
+        running[0] -= 1
+        return s.get() + i
+
+    nodes = [AsyncDerived(lambda i=i: query(i), task_factory=limiter) for i in range(20)]
+    total = AsyncDerived(lambda: gather(*(d() for d in nodes)), task_factory=limiter)  # nested calls share the slot of their caller
+
+    async with timeout(5):
+        assert await total() == list(range(20))
+        s.set(10)
+        assert await gather(*(d() for d in nodes)) == list(range(10, 30))
+
+    assert peak[0] == 3
+    assert limiter.running == 0
+
+
+async def test_concurrency_limiter_priorities():
+    limiter = ConcurrencyLimiter(1)
+    order = []
+
+    async def job(name: str):
+        order.append(name)
+        await sleep(0)
+
+    async with timeout(5):
+        first = limiter(lambda: job("first"))
+        low = [limiter.with_priority(-1)(lambda i=i: job(f"low {i}")) for i in range(2)]
+        high = limiter.with_priority(1)(lambda: job("high"))
+        await gather(first, *low, high)
+
+    assert order == ["first", "high", "low 0", "low 1"]
+
+
+@trio
+async def test_trio_concurrency_limiter():
+    from trio import open_nursery
+
+    s = Signal(1)
+
+    async with open_nursery() as nursery:
+        limiter = ConcurrencyLimiter(1, task_factory=create_trio_task_factory(nursery))
+
+        async def read():
+            return s.get()
+
+        f = AsyncDerived(read, task_factory=limiter)
+        g = AsyncDerived(lambda: f(), task_factory=limiter)
+        h = AsyncDerived(lambda: g(), task_factory=limiter)
+        assert await h() == 1  # a single slot is enough for a chain
+        s.set(2)
+        assert await h() == 2
+        assert limiter.running == 0
+
+
+async def test_task_group():
+    s = Signal(0)
+    gate = AsyncEvent()
+    seen = []
+
+    async def log():
+        value = s.get()
+        await gate.wait()
+        seen.append(value)
+
+    async with task_group() as start:
+        with AsyncEffect(log):
+            d = AsyncDerived(lambda: start(lambda: sleep(0, s.get() + 1)))
+            assert await d() == 1
+            s.set(1)
+            assert await d() == 2
+        gate.set()
+        assert seen == []
+    assert seen == [0, 1]  # the block waits for the tasks started in it
+
+
+@autojump
+async def test_trio_task_group():
+    from trio import sleep as trio_sleep
+    from trio.testing import wait_all_tasks_blocked
+
+    s = Signal(0)
+    seen = []
+
+    async def log():
+        value = s.get()
+        await trio_sleep(0.01)
+        seen.append(value)
+
+    async with task_group():
+        with AsyncEffect(log):
+            await wait_all_tasks_blocked()
+            s.set(1)
+            await wait_all_tasks_blocked()
+            s.set(2)
+            task = AsyncEffect(log, False).trigger()
+        assert await task is await task is None
+    assert sorted(seen) == [0, 1, 2, 2]
+
+
+async def test_default_task_factory_outside_tasks():
+    s = Signal(0)
+    tasks = []
+
+    async def read():
+        return s.get()
+
+    get_running_loop().call_soon(lambda: tasks.append(AsyncEffect(read, False).trigger()))  # a loop callback has no current task
+    await sleep(0)
+    assert await tasks[0] == 0
+
+
+async def test_signal_changes():
+    s = Signal(0)
+
+    with s.changes() as changes:
+        for i in range(1, 4):
+            s.set(i)
+        assert await anext(changes) == 3  # coalesced
+
+        async def later():
+            await sleep(0)  # after the consumer started waiting
+            s.set(4)
+
+        async with TaskGroup() as tg:
+            tg.create_task(later())
+            assert await anext(changes) == 4
+
+    with raises(StopAsyncIteration):
+        await anext(changes)
+    assert not s.subscribers
+
+    with s.changes(3) as changes:
+        for i in range(5, 10):
+            s.set(i)
+        s.set(9)  # equal values are not changes
+        assert [await anext(changes) for _ in range(3)] == [7, 8, 9]
+
+    with s.changes(2, "drop_newest") as changes:
+        for i in range(10, 15):
+            s.set(i)
+        assert [await anext(changes) for _ in range(2)] == [10, 11]
+
+    with s.changes(1, "error") as changes:
+        s.set(15)
+        s.set(16)
+        with raises(OverflowError):
+            await anext(changes)
+        assert await anext(changes) == 15  # 16 was lost
+        s.set(17)
+        assert await anext(changes) == 17
+
+
+@trio
+async def test_trio_signal_changes():
+    from trio import open_nursery
+    from trio import sleep as trio_sleep
+
+    s = Signal(0)
+    seen = []
+
+    async def consume():
+        async for value in changes:
+            seen.append(value)
+
+    with s.changes(10) as changes:
+        async with open_nursery() as nursery:
+            nursery.start_soon(consume)
+            for i in range(1, 4):
+                s.set(i)
+                await trio_sleep(0)
+            changes.dispose()
+
+    assert seen == [1, 2, 3]
+
+
+async def test_signal_from_async_iter():
+    queues = Queue[list[int] | None](), Queue[list[int] | None]()
+
+    async def stream(queue: Queue[list[int] | None]):
+        while (burst := await queue.get()) is not None:
+            for item in burst:
+                yield item
+
+    latest = signal_from_async_iter(stream(queues[0]))
+    total = derived_from_stream(stream(queues[1]), add, 0)
+    latest_seen, total_seen = [], []
+
+    with Effect(lambda: latest_seen.append(latest.get())), Effect(lambda: total_seen.append(total.get())):
+        async with timeout(5):
+            for i, burst in enumerate(([1, 2, 3], [4], [5, 6], None), 2):
+                for queue in queues:
+                    queue.put_nowait(burst)
+                while burst is not None and (len(latest_seen) < i or len(total_seen) < i):
+                    await sleep(0)  # the next burst is only sent after this one was flushed
+            await latest.task
+            await total.task
+
+    assert latest_seen == [None, 3, 4, 6]  # one notification per burst
+    assert total_seen == [0, 6, 10, 21]
+
+
+async def test_async_batch():
+    a, b, c = Signal(0), Signal(0), Signal(0)
+    gate = AsyncEvent()
+    seen = []
+
+    with Effect(lambda: seen.append((a.get(), b.get(), c.get()))):
+
+        async def other():
+            await sleep(0)
+            c.set(1)  # from another task, not held by the batch
+
+        async def child():
+            c.set(2)  # started inside the block, joins the batch
+            await gate.wait()
+            c.set(3)  # after the block, flushed right away
+
+        async with TaskGroup() as tg:
+            task = tg.create_task(other())
+            async with batch():
+                a.set(1)
+                await sleep(0)
+                b.set(1)
+                await task
+                assert seen == [(0, 0, 0), (1, 1, 1)]
+                a.set(2)
+                b.set(2)
+                tg.create_task(child())
+                await sleep(0)
+                assert seen == [(0, 0, 0), (1, 1, 1)]
+
+            assert seen == [(0, 0, 0), (1, 1, 1), (2, 2, 2)]  # flushed once at exit
+            gate.set()
+
+        assert seen[-1] == (2, 2, 3)
+
+
+async def test_async_effect_doesnt_inherit_batches():
+    s, t = Signal(0), Signal(0)
+    gate = AsyncEvent()
+    seen = []
+
+    async def write():
+        s.get()
+        await gate.wait()
+        t.update(lambda x: x + 1)
+
+    with Effect(lambda: seen.append(t.get())):
+        async with TaskGroup() as tg:
+            with AsyncEffect(write, False, task_factory=lambda f: tg.create_task(f())) as effect:
+                with batch():
+                    task = effect()
+                    await sleep(0)  # the task starts while the batch is open
+                gate.set()
+                await task
+                assert seen == [0, 1]  # the write isn't scheduled into the closed batch
+
+
+@autojump
+async def test_throttled():
+    from trio import current_time
+    from trio import sleep as trio_sleep
+
+    s = Signal(0)
+    t = throttled(s, 0.05, timer=current_time)
+    seen = []
+
+    with Effect(lambda: seen.append(t.get())):
+        for i in range(1, 6):
+            s.set(i)
+        assert t.get() == 5  # reads are never delayed
+        assert seen == [0, 1]  # the leading write notifies immediately
+        await trio_sleep(0.1)
+        assert seen == [0, 1, 5]  # the rest are coalesced into one trailing notification
+
+        await trio_sleep(0.05)  # the trailing notification started a new interval
+        s.set(6)
+        assert seen == [0, 1, 5, 6]
+
+    t.dispose()
+    assert not s.subscribers
+
+
+@autojump
+async def test_min_notify_interval():
+    from trio import current_time
+    from trio import sleep as trio_sleep
+
+    s = ThrottledSignal(0, 0.05, timer=current_time)
+    seen = []
+
+    with Effect(lambda: seen.append(s.get())):
+        s.set(1)
+        s.set(2)
+        s.set(3)
+        assert seen == [0, 1]
+        await trio_sleep(0.1)
+        assert seen == [0, 1, 3]
+
+
+def test_throttled_outside_event_loop():
+    now = 0.0
+    s = ThrottledSignal(0, 0.05, timer=lambda: now)
+    seen = []
+
+    with Effect(lambda: seen.append(s.get())):
+        s.set(1)
+        s.set(2)  # nothing to schedule a trailing notification on
+        assert seen == [0, 1, 2]
+        now = 0.1
+        s.set(3)
+        assert seen == [0, 1, 2, 3]
+
+
+@autojump
+async def test_debounced_effect():
+    from trio import current_time
+    from trio import sleep as trio_sleep
+
+    s = Signal(0)
+    seen = []
+
+    @debounced_effect(wait=0.05, timer=current_time)
+    def log():
+        seen.append(s.get())
+
+    with log:
+        assert seen == [0]
+        for i in range(1, 4):
+            s.set(i)
+            await trio_sleep(0.01)
+        assert seen == [0]
+        await trio_sleep(0.1)
+        assert seen == [0, 3]
+
+        s.set(4)
+    await trio_sleep(0.1)
+    assert seen == [0, 3]  # disposed before the timer fired
+
+
+@autojump
+async def test_trio_debounced_effect():
+    from trio import current_time, open_nursery
+    from trio import sleep as trio_sleep
+
+    s = Signal(0)
+    seen = []
+
+    async with open_nursery() as nursery:
+        with debounced_effect(lambda: seen.append(s.get()), 0.02, task_factory=create_trio_task_factory(nursery), timer=current_time):
+            s.set(1)
+            s.set(2)
+            await trio_sleep(0.05)
+            assert seen == [0, 2]
+
+
+async def test_stale_while_revalidate():
+    s = Signal(0)
+    now = 0.0
+    gate = AsyncEvent()
+
+    @async_derived(stale_while_revalidate=True, max_staleness=10)
+    async def f():
+        value = s.get()
+        if value:
+            await gate.wait()
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    f.timer = lambda: now
+    refreshing = f.is_refreshing
+
+    async with timeout(5):
+        assert await f() == 0  # nothing to serve yet
+        assert not refreshing.get() and f.error.get() is None
+
+        seen = []
+        with Effect(lambda: seen.append(refreshing.get())):
+            s.set(1)
+            assert await f() == 0  # stale value, refreshing in the background
+            while not refreshing.get():
+                await sleep(0)
+            assert seen == [False, True]
+            assert await f() == 0  # the running refresh is reused
+
+            gate.set()
+            while refreshing.get():
+                await sleep(0)
+            assert seen == [False, True, False]
+            assert await f() == 1
+
+        gate.clear()
+        s.set(2)
+        assert await f() == 1
+        now = 11.0
+        gate.set()
+        assert await f() == 2  # too stale, so wait for the refresh
+
+        s.set(-1)
+        assert await f() == 2
+        while f.error.get() is None:
+            await sleep(0)
+        assert isinstance(f.error.get(), ValueError)
+        assert await f() == 2  # errors are not raised while serving stale values
+
+        s.set(3)
+        assert await f() == 2
+        while f.error.get() is not None:
+            await sleep(0)
+        assert await f() == 3
+
+
+async def test_staleness_counts_from_invalidation():
+    s = Signal(0)
+    now = 0.0
+
+    @async_derived(stale_while_revalidate=True, max_staleness=10)
+    async def f():
+        return s.get()
+
+    f.timer = lambda: now
+
+    async with timeout(5):
+        assert await f() == 0
+
+        s.set(1)
+        now = 11.0  # nobody read the stale value in the meantime
+        assert await f() == 1  # too stale already, so wait for the refresh
+
+        s.set(2)
+        now = 15.0
+        assert await f() == 1  # within `max_staleness` of the invalidation
+        while await f() != 2:
+            await sleep(0)
+
+
 @mark.xfail(reason="Not working correctly due to batch logic issues.", raises=AssertionError, strict=True)
 @trio
 async def test_no_notify_on_first_set():
@@ -3,7 +3,7 @@ from typing import TypedDict
 
 from pytest import raises
 from reactivity import effect
-from reactivity.collections import ReactiveMappingProxy, ReactiveSequenceProxy, ReactiveSetProxy, reactive, reactive_object_proxy
+from reactivity.collections import ReactiveMappingProxy, ReactiveSequenceProxy, ReactiveSetProxy, filter_sequence, map_sequence, reactive, reactive_object_proxy
 from reactivity.primitives import Derived
 from utils import capture_stdout
 
@@ -174,6 +174,71 @@ def test_reactive_sequence_derived_no_memory_leak():
     assert not seq._iter.subscribers  # noqa: SLF001
 
 
+def test_map_sequence():
+    seq = ReactiveSequenceProxy([1, 2, 3])
+    calls = []
+
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    doubled = map_sequence(seq, double)
+    assert doubled == [2, 4, 6]
+    assert calls == [1, 2, 3]
+
+    with capture_stdout() as stdout, effect(lambda: print(doubled[0])), effect(lambda: print(len(doubled))):
+        assert stdout.delta == "2\n3\n"
+        seq.append(4)
+        assert calls[3:] == [4]
+        assert stdout.delta == "4\n"
+        seq[1] = 5
+        assert calls[4:] == [5]
+        assert stdout.delta == ""
+        seq.sort(reverse=True)  # only the moved items are recomputed
+        assert doubled == [10, 8, 6, 2]
+        assert stdout.delta == "10\n"
+        seq.insert(0, 0)
+        assert sorted(stdout.delta.split()) == ["0", "5"]
+        del seq[-1]
+        assert doubled == [0, 10, 8, 6]
+        assert stdout.delta == "4\n"
+
+    doubled.dispose()
+    seq.append(1)
+    assert doubled == [0, 10, 8, 6]
+
+
+def test_filter_sequence():
+    seq = ReactiveSequenceProxy([1, 2, 3, 4])
+    calls = []
+
+    def even(x):
+        calls.append(x)
+        return x % 2 == 0
+
+    evens = filter_sequence(seq, even)
+    assert evens == [2, 4]
+
+    with capture_stdout() as stdout, effect(lambda: print(evens[-1] if evens else None)):
+        assert stdout.delta == "4\n"
+        calls.clear()
+        seq.append(6)
+        assert calls == [6]
+        assert stdout.delta == "6\n"
+        seq.insert(0, 7)
+        assert stdout.delta == ""
+        seq[1:3] = [8]
+        assert evens == [8, 4, 6]
+        seq.pop()
+        assert stdout.delta == "4\n"
+        seq.clear()
+        assert evens == []
+        assert stdout.delta == "None\n"
+        seq.extend([2, 3])
+        assert stdout.delta == "2\n"
+        assert calls == [6, 7, 8, 2, 3]
+
+
 def test_reactive_object_proxy():
     from argparse import Namespace
 
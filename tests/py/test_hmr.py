@@ -68,18 +68,9 @@ def test_simple_circular_dependency():
             assert env.stdout_delta == "b\na\nc\n5\n"  # b <- a <- c
 
             env["a.py"].replace("one = 1", "one = 2")
-            assert env.stdout_delta == "a\nb\na\nc\n6\n"  # a <- b, b <- a <- c
+            assert env.stdout_delta == "a\nb\nc\n6\n"  # a <- c, with b pulled by a
 
-            """
-              TODO This is not an optimal behavior. Here are 2 alternate solutions:
-
-                1. Maximize consistency:
-                   Log the order of each `Derived` and replay every loop in its original order.
-                   Always run `a` before `b` in the tests above.
-                2. Greedy memoization:
-                   Always run the changed module first. Only run `a` when necessary.
-                   But if `a.one` changes every time, we'll have to run `b` twice to keep consistency.
-            """
+            # `b` is marked dirty as soon as `a.one` changes, so `a` reads the fresh `b.two` and doesn't need to run twice
 
 
 def test_private_methods_inaccessible():
@@ -1,17 +1,22 @@
 import gc
+import json
+import weakref
 from functools import cache
 from inspect import ismethod
 from pathlib import Path
-from typing import assert_type
+from typing import assert_type, override
 from warnings import filterwarnings
 from weakref import finalize
 
 from pytest import WarningsRecorder, raises, warns
-from reactivity import Reactive, batch, create_signal, effect, memoized, memoized_method, memoized_property
-from reactivity.context import default_context, new_context
-from reactivity.helpers import DerivedProperty, MemoizedMethod, MemoizedProperty
+from reactivity import Reactive, batch, create_signal, derived_family, effect, memoized, memoized_family, memoized_method, memoized_property, selector
+from reactivity.context import Stack, default_context, new_context
+from reactivity.equality import array_equal, identical, register_equality, shallow_equal
+from reactivity.graph import inspect_graph
+from reactivity.helpers import DerivedFamily, DerivedProperty, MemoizedFamily, MemoizedMethod, MemoizedProperty
 from reactivity.hmr.proxy import Proxy
 from reactivity.primitives import Derived, Effect, Signal, State
+from reactivity.tracing import Profiler, Tracer
 from utils import capture_stdout, current_lineno
 
 
@@ -549,6 +554,28 @@ def test_error_handling():
     assert default_context.current_computations == []
 
 
+def test_context_stacks_index_like_lists():
+    s = Signal(0)
+
+    def read_stack():
+        stack = default_context.current_computations
+        return s.get(), len(stack), stack[0], stack[1], stack[-1], outer in stack
+
+    inner = Derived(read_stack)
+    outer = Derived(lambda: inner())
+    assert outer() == (0, 2, outer, inner, inner, True)
+
+    stack = Stack[int]()
+    for i in range(3):
+        stack.append(i)
+    assert [stack[i] for i in range(-3, 3)] == [0, 1, 2, 0, 1, 2]
+    assert len(stack) == 3
+    with raises(IndexError):
+        stack[3]
+    with raises(IndexError):
+        stack[-4]
+
+
 def test_context_enter_dependency_restore():
     s = Signal(0)
     always = Signal(0)
@@ -817,6 +844,152 @@ def test_equality_check_among_dataframes():
         assert stdout.delta == "   a  b\n0  1  2\n"
 
 
+def test_custom_equality():
+    s = Signal([1, 2], equals=identical)
+    d = Derived(lambda: [*s.get()], equals=shallow_equal)
+
+    with capture_stdout() as stdout, Effect(lambda: print(d())):
+        s.set(s.get())
+        assert stdout.delta == "[1, 2]\n"
+        s.set([1, 2])  # a new list, so `s` notifies, but `d` doesn't
+        assert stdout.delta == ""
+        s.set([1, 3])
+        assert stdout.delta == "[1, 3]\n"
+
+
+def test_register_equality():
+    class Point:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    class Point3D(Point): ...
+
+    calls = []
+
+    @register_equality(Point)
+    def _(a, b):
+        calls.append((a, b))
+        return type(a) is type(b) and (a.x, a.y) == (b.x, b.y)
+
+    s = Signal(Point3D(0, 0))
+    assert not s.set(Point3D(0, 0))
+    assert s.set(Point3D(0, 1))
+    assert len(calls) == 2  # subclasses are dispatched too
+
+    s = Signal(Point(0, 0), equals=identical)  # per-signal strategy takes precedence
+    assert s.set(Point(0, 0))
+    assert len(calls) == 2
+
+
+def test_register_equality_by_public_name():
+    class Frame:
+        __module__ = "somelib.core.frame"
+        __qualname__ = "Frame"
+
+        def __eq__(self, other):
+            raise ValueError("ambiguous")
+
+    register_equality("somelib.Frame", lambda a, b: type(a) is type(b))  # like `pandas.DataFrame` for `pandas.core.frame.DataFrame`
+
+    s = Signal(Frame())
+    assert not s.set(Frame())
+
+
+def test_array_equal():
+    import numpy as np
+
+    a = np.arange(6)
+    assert array_equal(a, np.arange(6))
+    assert not array_equal(a, a.reshape(2, 3))
+    assert not array_equal(a, a.astype(np.float64))
+    assert not array_equal(a, [*a])
+    assert array_equal(np.array([np.nan]), np.array([np.nan]))  # compared bytewise
+
+
+def test_tracing():
+    context = new_context()
+    profiler = context.add_tracer(Profiler())
+
+    s = Signal(1, context=context)
+
+    def double():
+        return s.get() * 2
+
+    d = Derived(double, context=context)
+
+    with Effect(lambda: d() + s.get(), context=context) as e:
+        s.set(2)
+        s.set(3)
+
+    assert profiler.stats[d].runs == 3
+    assert profiler.stats[d].dependencies == 1
+    assert profiler.stats[e].runs == 3
+    assert profiler.stats[e].dependencies == 2
+    assert profiler.stats[s].notifies == 2
+    assert profiler.stats[s].fan_out == 4
+    assert {node for node, _ in profiler.top(2, sort="runs")} == {d, e}
+
+    with capture_stdout() as stdout:
+        profiler.print_stats()
+    assert "Derived(test_tracing.<locals>.double)" in stdout
+    assert stdout.splitlines()[0].split() == ["node", "runs", "total", "ms", "mean", "us", "max", "us", "deps", "notifies", "fan-out"]
+
+    events = []
+
+    class Recorder(Tracer):
+        @override
+        def on_start(self, computation, timestamp):
+            events.append(("start", computation))
+
+        @override
+        def on_end(self, computation, timestamp, dependencies):
+            events.append(("end", computation))
+
+    context.remove_tracer(profiler)
+    context.add_tracer(Recorder())
+    with context.effect(s.get) as e:
+        assert events == [("start", e), ("end", e)]
+    profiler.clear()
+    s.set(4)
+    assert not profiler.stats
+
+
+def test_inspect_graph():
+    context = new_context()
+    a = Signal(1, context=context)
+    b = Signal(2, context=context)
+
+    def total():
+        return a.get() + b.get()
+
+    d = Derived(total, context=context)
+    chain = Derived(lambda: d() + 1, context=context)
+
+    with Effect(chain, context=context) as e, Effect(a.get, context=context):
+        graph = inspect_graph(context=context)
+        assert len(graph.nodes) == 6
+        assert len(graph.edges) == 5
+        assert graph.longest_path[1:] == [d, chain, e]
+        assert graph.max_fan_out == (a, 2)
+
+        stats = graph.stats()
+        assert stats["kinds"] == {"source": 2, "derived": 2, "effect": 2}
+        assert stats["longest_path"][1] == "Derived(test_inspect_graph.<locals>.total)"
+
+        assert {*inspect_graph(b).nodes} == {*graph.nodes}  # reachable through `d` and `a`
+
+        data = json.loads(graph.to_json())
+        assert len(data["nodes"]) == 6
+        labels = [node["label"] for node in data["nodes"]]
+        assert [labels[i] for i in data["edges"][graph.edges.index((d, chain))]] == ["Derived(test_inspect_graph.<locals>.total)", "Derived(test_inspect_graph.<locals>.<lambda>)"]
+
+        dot = graph.to_dot()
+        assert dot.startswith('digraph "reactivity" {')
+        assert dot.count("->") == 5
+
+    assert len(inspect_graph(context=context).edges) == 3  # derived values stay subscribed to their sources
+
+
 def test_context():
     a = new_context()
     b = new_context()
@@ -1061,3 +1234,313 @@ def test_dependency_ordering():
         assert stdout.delta == "2 2\n"
         o.s = 3
         assert stdout.delta == "3 3\n"
+
+
+def test_derived_observers():
+    s = Signal(0)
+    a = Derived(s.get)
+    b = Derived(a)
+    c = Derived(b)
+
+    assert c() == 0
+    assert a.observers == b.observers == c.observers == 0
+
+    with Effect(c):
+        assert a.observers == b.observers == c.observers == 1
+
+        with Effect(a):
+            assert a.observers == 2
+        assert a.observers == 1
+
+        with capture_stdout() as stdout, Effect(lambda: print(b())):
+            s.set(1)
+            assert stdout == "0\n1\n"
+            assert b.observers == 2
+
+    assert a.observers == b.observers == c.observers == 0
+
+    s.set(2)
+    assert a.dirty
+    assert not b.dirty  # not pulled, so it wasn't notified
+    assert c() == 2
+
+
+def test_pull_through_diamonds():
+    s = Signal(0)
+    runs = []
+
+    top = s.get
+    for i in range(30):
+        a = Derived(lambda i=i, top=top: runs.append(f"a{i}") or top() + 1)
+        b = Derived(lambda i=i, top=top: runs.append(f"b{i}") or top() + 1)
+        top = Derived(lambda i=i, a=a, b=b: runs.append(f"c{i}") or (a() + b()) // 2)
+
+    assert top() == 30
+    assert len(runs) == 90
+
+    runs.clear()
+    assert top() == 30
+    assert runs == []
+
+    s.set(1)
+    assert top() == 31
+    assert len(runs) == len({*runs}) == 90  # each node recomputed exactly once
+
+
+def test_stable_edges_are_kept():
+    log = []
+
+    class LoggedSignal[T](Signal[T]):
+        __slots__ = ("name",)
+
+        def __init__(self, name: str, value: T):
+            super().__init__(value)
+            self.name = name
+
+        def subscribe(self, computation):
+            log.append(f"+{self.name}")
+            super().subscribe(computation)
+
+        def unsubscribe(self, computation):
+            log.append(f"-{self.name}")
+            super().unsubscribe(computation)
+
+    a, b, c, switch = LoggedSignal("a", 1), LoggedSignal("b", 2), LoggedSignal("c", 3), LoggedSignal("switch", True)
+
+    with Effect(lambda: a.get() + a.get() + (b.get() if switch.get() else c.get())):
+        assert log == ["+a", "+switch", "+b"]
+        log.clear()
+
+        a.set(10)
+        assert log == []
+
+        switch.set(False)
+        assert log == ["+c", "-b"]
+        log.clear()
+
+    assert sorted(log) == ["-a", "-c", "-switch"]
+
+
+def test_derived_family():
+    s = Signal(10)
+    calls = []
+
+    @derived_family(max_size=2)
+    def add(x):
+        calls.append(x)
+        return s.get() + x
+
+    assert add(1) == 11
+    assert add(1) == 11
+    assert add(2) == 12
+    assert (add.hits, add.misses, add.evictions) == (1, 2, 0)
+    assert calls == [1, 2]
+
+    node = add.node(1)
+    assert add(3) == 13  # evicts 2, the least recently used one
+    assert (len(add), add.evictions) == (2, 1)
+    assert node in s.subscribers
+    assert len(s.subscribers) == 2  # evicted nodes are disposed
+
+    with Effect(lambda: add(1)):
+        add(4)
+        add(5)  # 1 is in use, so it is kept
+        assert (1,) in add.nodes
+
+    ref = weakref.ref(add.node(5))
+    add.clear()
+    gc.collect()
+    assert ref() is None
+    assert not s.subscribers
+
+
+def test_family_eviction_policies():
+    now = 0.0
+    s = Signal(1)
+
+    family = MemoizedFamily(lambda x: s.get() * x, ttl=10, timer=lambda: now)
+    assert family(1) == 1
+    now = 5
+    assert family(2) == 2
+    now = 12
+    assert family(3) == 3
+    assert [*family.nodes] == [(2,), (3,)]
+
+    family = DerivedFamily(lambda x: s.get() * x, evict_unobserved=True)
+    with Effect(lambda: family(1)), Effect(lambda: family(1) + family(2)) as e:
+        assert len(family) == 2
+    assert not {*e.dependencies}
+    assert len(family) == 0
+    assert family.evictions == 2
+
+
+def test_family_keyword_arguments():
+    s = Signal(0)
+    family = MemoizedFamily(lambda *args, **kwargs: (s.get(), args, kwargs)[1:])
+
+    assert family(1, x=2) == ((1,), {"x": 2})
+    assert family((1,), frozenset({("x", 2)})) == (((1,), frozenset({("x", 2)})), {})  # not mistaken for the call above
+    assert family(1, ("x", 2)) == ((1, ("x", 2)), {})
+    assert len(family) == 3
+
+    assert family(1, x=2, y=3) is family(1, y=3, x=2)
+    assert len(family) == 4
+
+
+def test_family_method():
+    class Grid:
+        scale = State(1)
+
+        def __init__(self):
+            self.calls = 0
+
+        @memoized_family
+        def cell(self, x, y):
+            self.calls += 1
+            return (x + y) * self.scale
+
+    a, b = Grid(), Grid()
+    assert a.cell(1, 2) == a.cell(1, 2) == 3
+    assert b.cell(1, y=2) == 3
+    assert a.calls == b.calls == 1
+    assert a.cell is a.cell
+    assert a.cell is not b.cell
+
+    a.scale = 2
+    assert a.cell(1, 2) == 6
+    assert b.cell(1, y=2) == 3
+    assert a.calls == 2
+
+
+def test_ownership_root():
+    context = new_context()
+    s = Signal(0, context=context)
+    runs = []
+
+    with context.root() as root:
+        effects = [Effect(lambda i=i: runs.append((i, s.get())), context=context) for i in range(3)]
+        d = Derived(lambda: s.get() + 1, context=context)
+        Effect(d, context=context)
+
+    assert len(root.children) == 5
+    assert len(s.subscribers) == 4
+
+    Effect(s.get, context=context)  # not owned
+    root.dispose()
+
+    assert len(s.subscribers) == 1
+    assert not root.children
+    assert all(not e.dependencies for e in effects)
+    assert d.observers == 0
+
+
+def test_ownership_forgets_disposed():
+    context = new_context()
+    s = Signal(0, context=context)
+
+    with context.root() as root:
+        for _ in range(1000):
+            Effect(s.get, context=context).dispose()
+        kept = Effect(s.get, context=context)
+
+    assert [*root.children] == [kept]
+    root.dispose()
+    assert not s.subscribers
+
+
+def test_ownership_nested():
+    context = new_context()
+    outer, inner = Signal(0, context=context), Signal(0, context=context)
+    log = []
+
+    with context.root() as root:
+
+        @context.effect
+        def parent():
+            n = outer.get()
+
+            @context.effect
+            def child():
+                log.append((n, inner.get()))
+
+    assert log == [(0, 0)]
+    inner.set(1)
+    assert log == [(0, 0), (0, 1)]
+
+    outer.set(1)  # the old child is disposed before the new one is created
+    assert log == [(0, 0), (0, 1), (1, 1)]
+    assert len(inner.subscribers) == 1
+
+    inner.set(2)
+    assert log[-1] == (1, 2)
+    assert len(log) == 4
+
+    root.dispose()
+    assert not outer.subscribers
+    assert not inner.subscribers
+
+
+def test_no_ownership_outside_roots():
+    s = Signal(0)
+
+    with Effect(lambda: (s.get(), Effect(s.get))):
+        s.set(1)
+        assert len(s.subscribers) == 3  # nested effects leak without a root
+    for e in [*s.subscribers]:
+        e.dispose()
+
+
+def test_selector():
+    selected = Signal(0)
+    is_selected = selector(selected)
+    runs = [0] * 100
+    rows = []
+
+    for i in range(100):
+
+        def row(i=i):
+            runs[i] += 1
+            return is_selected(i)
+
+        rows.append(Effect(row))
+
+    assert runs == [1] * 100
+    assert len(is_selected.buckets) == 100
+
+    selected.set(5)
+    assert runs[0] == runs[5] == 2
+    assert sum(runs) == 102  # exactly two rows are notified
+
+    d = Derived(lambda: is_selected(7) and selected.get())  # reads both the selector and its source
+    with Effect(d):
+        selected.set(7)
+        assert d() == 7
+        assert sum(runs) == 104
+
+    with batch():
+        selected.set(1)
+        selected.set(2)
+    assert runs[7] == 3
+    assert runs[1] == 1  # never saw itself selected
+    assert runs[2] == 2
+
+    for e in rows:
+        e.dispose()
+    d.dispose()  # unobserved deriveds stay subscribed
+    assert not is_selected.buckets
+    is_selected.dispose()
+    assert not selected.subscribers
+
+
+def test_selector_untracked():
+    selected = Signal(0)
+    is_selected = selector(selected)
+
+    for key in range(1000):
+        assert is_selected(key) is (key == 0)
+    assert not is_selected.buckets  # no reader, so nothing to bucket
+
+    selected.set(5)
+    assert is_selected(5)
+    assert not is_selected.buckets
+    is_selected.dispose()
@@ -0,0 +1,242 @@
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Barrier, Event, Thread, current_thread
+
+from pytest import mark, raises
+from reactivity.context import new_context
+from reactivity.primitives import Derived, Effect, Signal
+
+THREADS = 8
+
+
+@contextmanager
+def frequent_switches():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def hammer(target: Callable[[int], object]):
+    barrier = Barrier(THREADS)
+    errors: list[BaseException] = []
+
+    def run(i: int):
+        barrier.wait()
+        try:
+            target(i)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [Thread(target=run, args=(i,)) for i in range(THREADS)]
+    with frequent_switches():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_per_thread_tracking():
+    context = new_context(thread_safe=True)
+    shared = Signal(0, context=context)
+    seen: dict[int, list[int]] = {}
+
+    def worker(i: int):
+        own = Signal(0, context=context)
+        values = seen[i] = []
+        with Effect(lambda: values.append(own.get()), context=context) as e:
+            for n in range(1, 200):
+                own.set(n)
+                shared.get()  # untracked read, must not leak into the effect of another thread
+            assert set(e.dependencies) == {own}
+
+    hammer(worker)
+
+    assert all(values == list(range(200)) for values in seen.values())
+    assert not shared.subscribers
+    assert not context.current_computations
+
+
+def test_concurrent_writes():
+    context = new_context(thread_safe=True)
+    signals = [Signal(0, context=context) for _ in range(THREADS)]
+    total = Derived(lambda: sum(s.get() for s in signals), context=context)
+    runs = []
+
+    with Effect(lambda: runs.append(total()), context=context):
+
+        def worker(i: int):
+            for n in range(1, 301):
+                signals[i].set(n)
+                total()
+
+        hammer(worker)
+
+        assert runs[-1] == total() == 300 * THREADS
+        assert runs == sorted(runs)  # flushes don't interleave
+
+
+def test_concurrent_subscriptions():
+    context = new_context(thread_safe=True)
+    s = Signal(0, context=context)
+    d = Derived(lambda: s.get() * 2, context=context)
+
+    def worker(i: int):
+        for n in range(100):
+            with Effect(d, context=context), Effect(s.get, context=context):
+                s.set(i * 100 + n)
+
+    hammer(worker)
+
+    assert s.subscribers == {d}  # unobserved deriveds stay subscribed to their sources
+    assert not d.subscribers
+    assert d.observers == 0
+
+
+def test_batch_per_thread():
+    context = new_context(thread_safe=True)
+    signals = [Signal(0, context=context) for _ in range(THREADS)]
+    runs = [0] * THREADS
+
+    def worker(i: int):
+        def count():
+            signals[i].get()
+            runs[i] += 1
+
+        with Effect(count, context=context):
+            for _ in range(50):
+                with context.batch():
+                    for n in range(10):
+                        signals[i].set(n)
+                    assert len(context.leaf.batches) == 1
+                signals[i].set(-1)
+
+    hammer(worker)
+
+    assert runs == [1 + 50 * 2] * THREADS
+
+
+@mark.parametrize("thread_safe", [False, True])
+def test_parallel_flush(thread_safe: bool):
+    context = new_context(thread_safe=thread_safe)
+    s = Signal(0, context=context)
+    d = Derived(lambda: s.get() + 1, context=context)
+    barrier = Barrier(THREADS, timeout=5)  # only passes if the effects run concurrently
+    seen = []
+
+    def effect():
+        value = d()
+        if value == 2:
+            barrier.wait()
+        seen.append((value, current_thread()))
+
+    effects = [Effect(effect, context=context) for _ in range(THREADS)]
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        with context.batch(executor=executor):
+            s.set(1)
+
+        assert len(seen) == THREADS * 2
+        assert {value for value, _ in seen[THREADS:]} == {2}
+        assert current_thread() not in {thread for _, thread in seen[THREADS:]}
+
+        for e in effects:
+            assert set(e.dependencies) == {d}
+
+        s.set(2)  # serial by default
+        assert {thread for _, thread in seen[THREADS * 2 :]} == {current_thread()}
+
+
+def test_parallel_flush_errors():
+    context = new_context()
+    s = Signal(0, context=context)
+    runs = []
+
+    def fail():
+        if s.get():
+            raise ValueError(s.get())
+
+    def count():
+        runs.append(s.get())
+
+    with Effect(fail, context=context), Effect(fail, context=context), Effect(count, context=context), ThreadPoolExecutor(2) as executor:
+        with raises(ExceptionGroup) as info, context.batch(executor=executor):
+            s.set(1)
+        assert [str(e) for e in info.value.exceptions] == ["1", "1"]
+        assert runs == [0, 1]
+
+
+def test_edges_wait_for_their_stripe():
+    from reactivity.primitives import _locked
+
+    context = new_context(thread_safe=True)
+    s = Signal(0, context=context)
+    reading = Event()
+    effects = []
+
+    def read():
+        reading.set()
+        s.get()
+
+    thread = Thread(target=lambda: effects.append(Effect(read, context=context)))
+
+    with _locked(s):  # as if another thread were adding or removing an edge of `s`
+        thread.start()
+        assert reading.wait(5)
+        assert thread.is_alive()  # blocked on the stripe, so the edge can't be half made
+        assert not s.subscribers
+
+    thread.join(5)
+    assert s.subscribers == {*effects}
+    assert len(effects) == 1
+
+
+def test_parallel_flush_new_edges():
+    context = new_context(thread_safe=True)
+    s = Signal(0, context=context)
+    t = Signal(1, context=context)
+
+    with ThreadPoolExecutor(THREADS) as executor, frequent_switches():
+        for _ in range(200):  # fresh nodes each time, so that their edge containers are allocated concurrently
+            base = Derived(lambda: t.get() * 2, context=context)  # observed through shared only
+            base()  # settled up front, so that workers only ever read it clean
+            shared = Derived(lambda base=base: base() + s.get(), context=context)
+
+            def effect(shared=shared):
+                if s.get():
+                    shared()  # a new edge, created in a worker
+
+            effects = [Effect(effect, context=context) for _ in range(16)]
+            with context.batch(executor=executor):
+                s.set(1)
+            assert shared.observers == len(shared.subscribers) == 16
+            assert base.observers == 1
+
+            for e in effects:
+                e.dispose()
+            s.set(0)
+            assert shared.observers == base.observers == 0
+
+
+def test_parallel_flush_refreshes_once():
+    context = new_context(thread_safe=True)
+    s = Signal(0, context=context)
+
+    with ThreadPoolExecutor(THREADS) as executor, frequent_switches():
+        for _ in range(100):
+            runs = []
+            shared = Derived(lambda runs=runs: runs.append(None) or s.get(), context=context)
+            effects = [Effect(lambda shared=shared: s.get() and shared(), context=context) for _ in range(16)]
+            with context.batch(executor=executor):
+                s.set(1)
+            assert len(runs) == 1  # workers reading the same dirty node wait for each other
+
+            for e in effects:
+                e.dispose()
+            s.set(0)
@@ -6,9 +6,10 @@ from reactivity.async_primitives import AsyncFunction
 
 if TYPE_CHECKING:
     from trio import Nursery
+    from trio.abc import Clock
 
 
-async def run_trio_in_asyncio[T](trio_main: Callable[[], Coroutine[Any, Any, T]]) -> T:
+async def run_trio_in_asyncio[T](trio_main: Callable[[], Coroutine[Any, Any, T]], clock: "Clock | None" = None) -> T:
     """
     Run a trio async function inside an asyncio event loop using *guest mode*
     See: https://trio.readthedocs.io/en/stable/reference-lowlevel.html#using-guest-mode-to-run-trio-on-top-of-other-event-loops
@@ -34,6 +35,7 @@ async def run_trio_in_asyncio[T](trio_main: Callable[[], Coroutine[Any, Any, T]]
         run_sync_soon_threadsafe=loop.call_soon_threadsafe,
         done_callback=done_callback,
         host_uses_signal_set_wakeup_fd=True,  # asyncio uses signal.set_wakeup_fd
+        clock=clock,
     )
 
     return await future